@@ -1,95 +1,488 @@
 import json
 import os
 import argparse
-from datetime import datetime
-from collections import defaultdict
+import asyncio
+import cProfile
+import heapq
+import pstats
+from datetime import datetime, timedelta
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 import re
+import shutil
+import functools
 import hashlib
+import math
+import operator
+import zlib
+import sqlite3
 import sys
+import time
+import zipfile
 
+try:
+    import numpy  # Optional: batches the --classify similarity computation
+except ImportError:
+    numpy = None
+
+# Integrated keywords mapping used by --categorize-by-keywords and --categorize-by-title
+KEYWORDS_MAPPING = {
+    'DevOps': ['devops', 'ci/cd', 'jenkins', 'kubernetes', 'docker', 'ansible', 'terraform', 'prometheus', 'grafana', 'gitlab', 'circleci', 'chef', 'puppet'],
+    'System Administration': ['mikrotik', 'nginx', 'ubuntu', 'server', 'zimbra', 'linux', 'windows server', 'active directory', 'dns', 'dhcp', 'apache', 'ftp', 'firewall', 'ssl', 'let\'s encrypt'],
+    'Development/Programming': ['python', 'bash', 'powershell', 'git', 'script', 'javascript', 'js', 'html', 'css', 'c#', 'java', 'ruby', 'php', 'go', 'rust', 'typescript', 'node.js', 'django', 'flask'],
+    'Web Development': ['html', 'css', 'javascript', 'js', 'react', 'angular', 'vue', 'node.js', 'express', 'wordpress', 'drupal', 'joomla', 'sass', 'bootstrap', 'tailwind', 'npm', 'webpack'],
+    'Database Management': ['sql', 'mysql', 'postgresql', 'mongodb', 'database', 'oracle', 'sql server', 'nosql', 'redis', 'cassandra', 'sqlite', 'dbms', 'schema', 'replication', 'sharding'],
+    'Networking': ['tcp', 'udp', 'vpn', 'firewall', 'routing', 'switching', 'cisco', 'network', 'ip', 'subnet', 'dhcp', 'lan', 'wan', 'bgp', 'ospf', 'icmp', 'nat', 'dhcp'],
+    'Cloud Computing': ['aws', 'azure', 'gcp', 'cloud', 'ec2', 's3', 'lambda', 'cloudformation', 'cloudwatch', 'docker', 'kubernetes', 'serverless', 'rds', 'load balancer', 'autoscaling', 'iam', 'terraform'],
+    'Security': ['rsa', 'aes', 'sha', 'encryption', 'cybersecurity', 'ssl', 'tls', 'firewall', 'vulnerability', 'penetration testing', 'hacking', 'malware', 'ransomware', 'phishing', 'ddos', 'brute force', 'zero-day', 'backdoor', 'keylogger', 'siem', 'ids', 'ips', 'soc', 'threat hunting'],
+    'Artificial Intelligence': ['ai', 'machine learning', 'deep learning', 'neural network', 'tensorflow', 'pytorch', 'nlp', 'computer vision', 'reinforcement learning', 'supervised learning', 'unsupervised learning', 'gpt', 'transformer', 'classification', 'regression', 'clustering', 'cnn', 'rnn'],
+    'Data Science': ['data science', 'data analysis', 'pandas', 'numpy', 'matplotlib', 'statistics', 'data visualization', 'regression', 'classification', 'clustering', 'big data', 'hadoop', 'spark', 'etl', 'data pipeline', 'data wrangling', 'jupyter', 'sql', 'excel'],
+    'Project Management': ['agile', 'scrum', 'kanban', 'project management', 'jira', 'confluence', 'trello', 'waterfall', 'pmp', 'scope', 'risk management', 'stakeholder', 'milestones', 'deliverables'],
+    'Personal Development': ['productivity', 'time management', 'self-improvement', 'career', 'motivation', 'leadership', 'communication', 'teamwork', 'emotional intelligence', 'problem solving', 'decision making'],
+    'Health and Wellness': ['health', 'fitness', 'nutrition', 'mental health', 'wellness', 'exercise', 'diet', 'vitamin', 'therapy', 'meditation', 'yoga', 'supplements', 'hydration', 'stress management'],
+    'Travel': ['visa', 'travel', 'passport', 'immigration', 'flight', 'hotel', 'tourism', 'itinerary', 'booking', 'customs', 'airport', 'baggage', 'trip', 'insurance', 'reagrupación familiar', 'permiso de trabajo', 'obtención ciudadanía'],
+    'Language Learning': ['english', 'spanish', 'russian', 'language', 'learning', 'grammar', 'vocabulary', 'ielts', 'toefl', 'esl', 'speaking', 'listening', 'writing', 'reading'],
+    'Hardware': ['raspberry pi', 'arduino', 'hardware', 'cpu', 'gpu', 'motherboard', 'ssd', 'hdd', 'ram', 'power supply', 'peripherals', 'usb', 'bios', 'overclocking', 'cooling', 'raspbian', 'firmware', 'pixel 8 pro', 'móviles'],
+    'E-Commerce': ['promo code', 'discount', 'free shipping', 'return policy', 'coupon', 'checkout', 'gift card', 'deal', 'sale'],
+    'Support and Troubleshooting': ['help desk', 'it support', 'troubleshoot', 'ticketing', 'incident management', 'escalation', 'remote support', 'system logs', 'error logs', 'patching', 'backup', 'restore', 'diagnostics', 'sla', 'downtime', 'uptime', 'root cause analysis', 'Touch Screen Confirmation'],
+    'Finance and Investment': ['dividends', 'capped amount', 'investment return', 'passive income', 'ganar €20,000', '€', '$', '£', '¥'],
+    'Entertainment': ['series de fantasía', 'películas', 'libros de fantasía', 'videojuegos', 'música', 'arte digital', 'streaming', 'comics', 'novelas gráficas'],
+    'Legal and Documentation': ['legal document', 'contract', 'agreement', 'terms and conditions', 'privacy policy', 'license', 'certification', 'visa application', 'residence permit', 'tax id', 'work permit', 'official document', 'notarized document', 'birth certificate'],
+    'Miscellaneous': []
+}
+
+# Manifest of exported conversations kept in the output directory for incremental runs
+MANIFEST_FILENAME = '.chatgpt_to_obsidian_manifest.json'
+
+# Full-text search index kept in the output directory when --search-index is used
+SEARCH_INDEX_FILENAME = '.search_index.sqlite'
+
+# Characters removed from titles to make them valid file names
+INVALID_FILENAME_CHARACTERS = re.compile(r'[<>:"/\\|?*\n\t]')
+
+# Key set on a conversation whose file name needs a numbered suffix to be unique in the run
+FILENAME_SUFFIX_KEY = '_filename_suffix'
+
+# Folder of the per-category pages written by --index-pages
+INDEX_SHARDS_FOLDER = '_index'
+
+# Similarity detection: MinHash signature size (a power of two), the similarity from which
+# a related conversation is labelled a near-duplicate, and the heading of the related section
+MINHASH_PERMUTATIONS = 64
+NEAR_DUPLICATE_SIMILARITY = 0.8
+RELATED_SECTION_MARKER = '\n---\n### Related conversations\n'
+
+# Number of most frequent words per conversation used as features by --classify
+CLASSIFIER_TERMS = 64
+
+# Run context shared with pool worker processes, set by init_worker
+WORKER_CONTEXT = None
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_filename(filename):
     """Sanitize the filename to remove invalid characters."""
     if filename is None or filename.strip() == "":
         return "noname"
-    invalid_characters = '<>:"/\\|?*\n\t'
-    for char in invalid_characters:
-        filename = filename.replace(char, '')
-    return filename
+    return INVALID_FILENAME_CHARACTERS.sub('', filename)
 
+@functools.lru_cache(maxsize=4096)
 def generate_hash(text):
     """Generate a short hash of the given text."""
     return hashlib.sha256(text.encode('utf-8')).hexdigest()[:6]
 
-def get_conversation_text(node_id, mapping, conversation_text_list):
-    """Extract the conversation text without formatting for keyword analysis."""
-    node = mapping.get(node_id, {})
-    if node.get('message') and 'content' in node['message'] and 'parts' in node['message']['content']:
-        content_parts = node['message']['content']['parts']
-        for part in content_parts:
-            if isinstance(part, str):
-                conversation_text_list.append(part)
-            elif isinstance(part, dict) and 'text' in part:
-                conversation_text_list.append(part['text'])
-    for child_id in node.get('children', []):
-        get_conversation_text(child_id, mapping, conversation_text_list)
-
-def get_conversation(node_id, mapping, conversation_list, message_count):
-    """Extract the conversation content with formatting for output."""
-    node = mapping.get(node_id, {})
-    if node.get('message') and 'content' in node['message'] and 'parts' in node['message']['content']:
-        content_parts = node['message']['content']['parts']
-        parts_text = []
-        for part in content_parts:
-            if isinstance(part, str):
-                parts_text.append(part)
-            elif isinstance(part, dict) and 'text' in part:
-                parts_text.append(part['text'])
+def get_conversation_names(item, export_datetime):
+    """Resolve a conversation's sanitized title, creation datetime, date-hash folder name and file name stem.
+
+    Conversations without a create_time are dated at the start of the export.
+    """
+    title_sanitized = sanitize_filename(item.get("title"))
+    create_time = item.get("create_time")
+    datetime_obj = datetime.fromtimestamp(create_time) if create_time else export_datetime
+    folder_name = f"{datetime_obj.strftime('%Y-%m-%d')}-{generate_hash(title_sanitized + str(create_time))}"
+    file_stem = f"{datetime_obj.strftime('%Y-%m-%d_%H-%M-%S')}_{title_sanitized}"
+    return title_sanitized, datetime_obj, folder_name, file_stem
+
+def find_latest_copies(input_files):
+    """Find the most recent copy of every conversation that appears more than once in the input files.
+
+    Returns {conversation id: index of the copy to export among that conversation's copies, in input
+    order}; the copy with the latest update_time wins, and the later copy on a tie.
+    """
+    latest = {}
+    copies = Counter()
+    for input_file in input_files:
+        try:
+            for item in iter_conversations(input_file):
+                if not item.get("title"):
+                    continue
+                conversation_id = get_conversation_id(item, sanitize_filename(item.get("title")))
+                update_time = item.get("update_time") or 0
+                if conversation_id not in latest or update_time >= latest[conversation_id][0]:
+                    latest[conversation_id] = (update_time, copies[conversation_id])
+                copies[conversation_id] += 1
+        except json.JSONDecodeError:
+            break  # Reported when the conversations are loaded
+    return {conversation_id: copy for conversation_id, (_, copy) in latest.items() if copies[conversation_id] > 1}
+
+def get_claimed_names(manifest_conversations):
+    """Return the folder and file name recorded in the manifest for each conversation, keyed by (folder, stem)."""
+    claimed = {}
+    for conversation_id, entry in manifest_conversations.items():
+        folder_name, filename = entry['file_path'].split(os.sep)[-2:]
+        claimed.setdefault((folder_name, filename[:-len('.md')]), conversation_id)
+    return claimed
+
+def get_path_owners(manifest_conversations):
+    """Return {note path relative to the output folder: conversation id} for the notes in the manifest."""
+    owners = {}
+    for conversation_id, entry in manifest_conversations.items():
+        owners.setdefault(entry['file_path'], conversation_id)
+    return owners
+
+def claim_conversation_names(conversations, export_datetime, claimed, latest_copies):
+    """Skip repeated copies of a conversation and number file names shared by different conversations.
+
+    Only one copy of a conversation found several times in the input is exported: the one chosen by
+    find_latest_copies, or else the first. Two conversations with the same title created in the same
+    second resolve to the same paths; names already recorded in the manifest (claimed) stay with their
+    conversation, and other conversations get a ' (2)', ' (3)', ... suffix so no note overwrites
+    another, whatever the order of the input. Runs in the main process before conversations are
+    handed to workers, so names are unique across the whole run.
+    """
+    copies = Counter()
+    skipped = 0
+    for item in conversations:
+        if item.get("title"):
+            title_sanitized, _, folder_name, file_stem = get_conversation_names(item, export_datetime)
+            conversation_id = get_conversation_id(item, title_sanitized)
+            copy = copies[conversation_id]
+            copies[conversation_id] += 1
+            if copy != latest_copies.get(conversation_id, 0):
+                skipped += 1
+                continue
+            suffix = ''
+            number = 1
+            while claimed.setdefault((folder_name, file_stem + suffix), conversation_id) != conversation_id:
+                number += 1
+                suffix = f" ({number})"
+            if suffix:
+                item[FILENAME_SUFFIX_KEY] = suffix
+        yield item
+    if skipped:
+        print(f"Skipped {skipped} repeated copies of conversations found more than once in the input.")
+
+def get_conversation_id(item, title_sanitized):
+    """Return the export's conversation id, or a stable substitute for exports without one."""
+    conversation_id = item.get('conversation_id') or item.get('id')
+    if conversation_id:
+        return conversation_id
+    return hashlib.sha256(f"{title_sanitized}{item.get('create_time')}".encode('utf-8')).hexdigest()
+
+def conversation_fingerprint(item):
+    """Fingerprint a conversation's content from its update time and a hash of its mapping."""
+    mapping_json = json.dumps(item.get('mapping', {}), sort_keys=True, ensure_ascii=False)
+    mapping_hash = hashlib.sha256(mapping_json.encode('utf-8')).hexdigest()
+    return f"{item.get('update_time')}:{mapping_hash}"
+
+def settings_fingerprint(keywords_mapping, categorize_by_keywords, categorize_by_title, active_branch):
+    """Fingerprint the settings that decide keyword-based categories."""
+    settings_json = json.dumps([keywords_mapping, categorize_by_keywords, categorize_by_title, active_branch], sort_keys=True)
+    return hashlib.sha256(settings_json.encode('utf-8')).hexdigest()
+
+def load_manifest(output_dir):
+    """Load the manifest of previously exported conversations from the output directory."""
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    if not os.path.isfile(manifest_path):
+        return {'settings': None, 'conversations': {}}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        try:
+            manifest = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"Warning: Could not read manifest '{manifest_path}': {e}. Exporting all conversations.")
+            return {'settings': None, 'conversations': {}}
+    manifest.setdefault('settings', None)
+    manifest.setdefault('conversations', {})
+    return manifest
+
+def save_manifest(output_dir, manifest):
+    """Write the manifest atomically so an interrupted run never leaves it truncated."""
+    manifest_path = os.path.join(output_dir, MANIFEST_FILENAME)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(temp_path, manifest_path)
+
+def iter_conversation_nodes(mapping, root_node_id, current_node=None):
+    """Walk conversation nodes in order without recursion.
+
+    By default every branch is visited depth-first from the root. When current_node is given,
+    only the branch the user actually saw is followed, from the root down to current_node.
+    """
+    seen = set()
+    if current_node is not None and current_node in mapping:
+        branch = []
+        node_id = current_node
+        while node_id is not None and node_id in mapping and node_id not in seen:
+            seen.add(node_id)
+            branch.append(mapping[node_id])
+            node_id = mapping[node_id].get('parent')
+        yield from reversed(branch)
+        return
+    stack = [root_node_id]
+    while stack:
+        node_id = stack.pop()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        node = mapping.get(node_id, {})
+        yield node
+        # Push children reversed so the first child is visited first
+        stack.extend(reversed(node.get('children', [])))
+
+def find_root_node(mapping):
+    """Return the id of the node without a parent, or None."""
+    return next((node_id for node_id, node in mapping.items() if node.get('parent') is None), None)
+
+def get_active_node(item, context):
+    """Return the conversation's current_node when only the active branch is exported."""
+    if not context['active_branch']:
+        return None
+    current_node = item.get('current_node')
+    return current_node if current_node in item.get('mapping', {}) else None
+
+def get_message_parts(node):
+    """Return the text parts of a node's message, or None if it has no content parts."""
+    message = node.get('message')
+    if not (message and 'content' in message and 'parts' in message['content']):
+        return None
+    parts_text = []
+    for part in message['content']['parts']:
+        if isinstance(part, str):
+            parts_text.append(part)
+        elif isinstance(part, dict) and 'text' in part:
+            parts_text.append(part['text'])
+    return parts_text
+
+def build_conversation_messages(item, context):
+    """Build the message model of a conversation: a list of (role, tool name, text) records.
+
+    The conversation tree is walked once; keyword scoring, Markdown rendering and prompt
+    generation all read from the returned list. Returns None if no root node is found.
+    """
+    mapping = item.get('mapping', {})
+    current_node = get_active_node(item, context)
+    root_node_id = None if current_node else find_root_node(mapping)
+    if current_node is None and root_node_id is None:
+        return None
+    messages = []
+    for node in iter_conversation_nodes(mapping, root_node_id, current_node):
+        parts_text = get_message_parts(node)
         if parts_text:
-            author_role = node['message']['author']['role']
-            if author_role == "user":
-                conversation_list.append(f"<span style='color:#57130a;'>Human:</span>\n{''.join(parts_text)}\n")
-            elif author_role == "assistant":
-                conversation_list.append(f"<span style='color:#0a571f;'>ChatGPT:</span>\n{''.join(parts_text)}\n")
-            elif author_role == "tool":
-                tool_name = node['message']['author'].get('name', 'Unknown Tool')
-                conversation_list.append(f"**{tool_name}:** {''.join(parts_text)}\n")
-            message_count[0] += 1  # Increment message count
-    for child_id in node.get('children', []):
-        get_conversation(child_id, mapping, conversation_list, message_count)
-
-def generate_unique_filename(base_path, title, datetime_iso):
-    """Generate a unique filename with datetime."""
-    filename = f"{datetime_iso}_{sanitize_filename(title)}"
-    file_path = os.path.join(base_path, f"{filename}.md")
-    return file_path
+            author = node['message']['author']
+            tool_name = author.get('name', 'Unknown Tool') if author['role'] == "tool" else None
+            messages.append((author['role'], tool_name, ''.join(parts_text)))
+    return messages
+
+def get_conversation_text(messages):
+    """Extract the conversation text without formatting for keyword analysis."""
+    return ' '.join(text for _, _, text in messages)
+
+def render_conversation(messages):
+    """Render the conversation content with formatting for output."""
+    conversation_list = []
+    for role, tool_name, text in messages:
+        if role == "user":
+            conversation_list.append(f"<span style='color:#57130a;'>Human:</span>\n{text}\n")
+        elif role == "assistant":
+            conversation_list.append(f"<span style='color:#0a571f;'>ChatGPT:</span>\n{text}\n")
+        elif role == "tool":
+            conversation_list.append(f"**{tool_name}:** {text}\n")
+    return '\n'.join(conversation_list)
+
+def ensure_folder(folder, known_folders):
+    """Create a folder unless it is already known to exist, returning True if it was created."""
+    if folder in known_folders:
+        return False
+    if os.path.dirname(folder) in known_folders:
+        # The parent exists, so a single mkdir both checks and creates
+        try:
+            os.mkdir(folder)
+            created = True
+        except FileExistsError:
+            created = False
+        except FileNotFoundError:
+            # The parent was removed since it was cached, e.g. emptied by another worker
+            os.makedirs(folder, exist_ok=True)
+            created = True
+    else:
+        created = not os.path.isdir(folder)
+        if created:
+            os.makedirs(folder, exist_ok=True)  # Another worker may create it first
+    known_folders.add(folder)
+    return created
+
+def write_text_file(path, text):
+    """Write text to a file as UTF-8 with a single open, write and close.
+
+    The text goes to a temporary file that is renamed over the target, so an interrupted run
+    leaves either the old or the new file, never a half-written one.
+    """
+    data = memoryview(text.encode('utf-8'))
+    temp_path = path + '.tmp'
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+    os.replace(temp_path, path)
+
+def generate_unique_filename(base_path, item, file_stem):
+    """Generate the note and prompt file paths, using the suffix claimed for conversations that share a name."""
+    filename = file_stem + item.get(FILENAME_SUFFIX_KEY, '')
+    return os.path.join(base_path, f"{filename}.md"), os.path.join(base_path, f"{filename}_prompt.txt")
+
+def render_index_table(conversations, output_dir):
+    """Render the index table rows linking to a list of conversations."""
+    lines = ["| Status | Title | Created | Updated | Messages |\n", "| :---: | :--- | :---: | :---: | :---: |\n"]
+    for convo in conversations:
+        relative_path = os.path.relpath(convo['file_path'], output_dir).replace('\\', '/')
+        # Escape pipe character in the link
+        title_link = f"[[{relative_path}\\|{convo['title']}]]"
+        lines.append(f"| {convo.get('status', '🤖')} | {title_link} | {convo['created']} | {convo['updated']} | {convo['messages']} |\n")
+    return lines
 
 def create_index(output_dir, categorized_conversations):
     """Create an index file grouped by categories with date, time, and message count."""
-    index_path = os.path.join(output_dir, "index.md")
-    with open(index_path, 'w', encoding='utf-8') as index_file:
-        index_file.write("# Conversation Index\n\n")
-        index_file.write("## Legend\n")
-        index_file.write("🤖 Created | 🔄 Updated\n\n")
-        for category, conversations in categorized_conversations.items():
-            index_file.write(f"## {category}\n\n")
-            index_file.write("| Status | Title | Created | Updated | Messages |\n")
-            index_file.write("| :---: | :--- | :---: | :---: | :---: |\n")
-            for convo in conversations:
-                relative_path = os.path.relpath(convo['file_path'], output_dir).replace('\\', '/')
-                # Escape pipe character in the link
-                title_link = f"[[{relative_path}\\|{convo['title']}]]"
-                index_file.write(f"| 🤖 | {title_link} | {convo['created']} | {convo['updated']} | {convo['messages']} |\n")
-            index_file.write("\n")
-
-def categorize_by_keywords_in_text(conversation_text, keywords_mapping):
+    lines = ["# Conversation Index\n\n", "## Legend\n", "🤖 Created | 🔄 Updated\n\n"]
+    for category, conversations in categorized_conversations.items():
+        lines.append(f"## {category}\n\n")
+        lines.extend(render_index_table(conversations, output_dir))
+        lines.append("\n")
+    write_text_file(os.path.join(output_dir, "index.md"), ''.join(lines))
+
+def paginate_conversations(conversations, index_pages, page_size):
+    """Split a category's conversations into (page name, conversations) pages by creation month or row count."""
+    if index_pages == 'month':
+        pages = defaultdict(list)
+        for convo in conversations:
+            pages[convo['created'][:7]].append(convo)
+        return sorted(pages.items())
+    return [(f"page-{number + 1:03d}", conversations[start:start + page_size])
+            for number, start in enumerate(range(0, len(conversations), page_size))]
+
+def render_sharded_index(output_dir, categorized_conversations, index_pages, page_size):
+    """Render the top-level index with counts per category and the paged category indexes, keyed by relative path."""
+    shards = {}
+    summary = ["# Conversation Index\n\n", "## Legend\n", "🤖 Created | 🔄 Updated\n\n",
+               "| Category | Conversations | Pages |\n", "| :--- | :---: | :--- |\n"]
+    for category, conversations in categorized_conversations.items():
+        pages = paginate_conversations(conversations, index_pages, page_size)
+        page_paths = [f"{INDEX_SHARDS_FOLDER}/{category}/{name}.md" for name, _ in pages]
+        for position, (name, page) in enumerate(pages):
+            navigation = ["[[index|Conversation Index]]"]
+            if position > 0:
+                navigation.append(f"[[{page_paths[position - 1]}|← {pages[position - 1][0]}]]")
+            if position + 1 < len(pages):
+                navigation.append(f"[[{page_paths[position + 1]}|{pages[position + 1][0]} →]]")
+            lines = [f"# {category}: {name}\n\n", ' · '.join(navigation) + "\n\n"]
+            lines.extend(render_index_table(page, output_dir))
+            shards[page_paths[position]] = ''.join(lines)
+        page_links = ', '.join(f"[[{path}\\|{name}]]" for path, (name, _) in zip(page_paths, pages))
+        summary.append(f"| {category} | {len(conversations)} | {page_links} |\n")
+    shards['index.md'] = ''.join(summary)
+    return shards
+
+def create_sharded_index(output_dir, categorized_conversations, index_pages, page_size, previous_shards, known_folders):
+    """Write the sharded index, skipping pages whose content is unchanged since the last run.
+
+    Returns the content hash of every page, to be stored in the manifest, and the number of pages written.
+    """
+    shard_hashes = {}
+    written = 0
+    for relative_path, content in render_sharded_index(output_dir, categorized_conversations, index_pages, page_size).items():
+        shard_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+        shard_hashes[relative_path] = shard_hash
+        shard_path = os.path.join(output_dir, relative_path)
+        if previous_shards.get(relative_path) == shard_hash and os.path.isfile(shard_path):
+            continue
+        ensure_folder(os.path.join(output_dir, INDEX_SHARDS_FOLDER), known_folders)
+        ensure_folder(os.path.dirname(shard_path), known_folders)
+        write_text_file(shard_path, content)
+        written += 1
+    remove_index_shards(output_dir, previous_shards, keep=shard_hashes)
+    return shard_hashes, written
+
+def remove_index_shards(output_dir, shards, keep):
+    """Remove index pages written by a previous run that are no longer part of the index."""
+    for relative_path in shards:
+        if relative_path in keep:
+            continue
+        shard_path = os.path.join(output_dir, relative_path)
+        try:
+            os.remove(shard_path)
+        except FileNotFoundError:
+            pass
+        remove_empty_folders(os.path.dirname(shard_path), output_dir)
+
+def keywords_trie_to_regex(node):
+    """Convert a character trie of keywords into a prefix-factored regex alternation."""
+    branches = [re.escape(char) + keywords_trie_to_regex(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # A keyword ends here; the greedy optional tries longer keywords first
+        pattern = '(?:' + pattern + ')?'
+    return pattern
+
+def compile_keywords_matcher(keywords_mapping):
+    """Compile all keywords into a single regex so each text is scanned only once."""
+    keys = {}
+    for keywords in keywords_mapping.values():
+        for keyword in keywords:
+            if keyword:
+                keys.setdefault(keyword.lower(), keyword)
+    if not keys:
+        return None
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    # The lookahead reports a match at every position, so overlapping keywords are all seen
+    pattern = re.compile(r'(?=\b(' + keywords_trie_to_regex(trie) + r')\b)', re.IGNORECASE)
+    # Shorter keywords that match wherever a longer one does, e.g. 'sql' within 'sql server'
+    overlaps = {
+        key: [other for other in keys
+              if len(other) < len(key) and key.startswith(other) and re.match(re.escape(other) + r'\b', key)]
+        for key in keys
+    }
+    return pattern, keys, overlaps
+
+def categorize_by_keywords_in_text(conversation_text, keywords_mapping, matcher=None):
     """Categorize a conversation based on keyword frequency in its text."""
+    if matcher is None:
+        matcher = compile_keywords_matcher(keywords_mapping)
+    keyword_counts = defaultdict(int)
+    if matcher:
+        pattern, keys, overlaps = matcher
+        next_start = {}
+        for match in pattern.finditer(conversation_text):
+            start = match.start()
+            key = match.group(1).lower()
+            if key not in keys:
+                # Characters that case-fold differently from str.lower()
+                key = next(k for k in keys if re.fullmatch(re.escape(k), match.group(1), re.IGNORECASE))
+            for matched_key in (key, *overlaps[key]):
+                # Occurrences of the same keyword never overlap, as with re.findall
+                if start >= next_start.get(matched_key, 0):
+                    keyword_counts[matched_key] += 1
+                    next_start[matched_key] = start + len(matched_key)
     category_scores = {}
     for category, keywords in keywords_mapping.items():
-        score = 0
-        for keyword in keywords:
-            # Count the occurrences of the keyword in the text
-            count = len(re.findall(r'\b' + re.escape(keyword) + r'\b', conversation_text, re.IGNORECASE))
-            score += count
+        score = sum(keyword_counts.get(keyword.lower(), 0) for keyword in keywords)
         if score > 0:
             category_scores[category] = score
     if category_scores:
@@ -102,19 +495,17 @@ def categorize_by_keywords_in_text(conversation_text, keywords_mapping):
     else:
         return None
 
-def generate_chatgpt_prompt(conversation_list):
+def generate_chatgpt_prompt(messages):
     """Generate a prompt to simulate the conversation in ChatGPT."""
-    prompt = ""
-    for entry in conversation_list:
-        if "<span style='color:#57130a;'>Human:</span>" in entry:
-            content = entry.replace("<span style='color:#57130a;'>Human:</span>\n", "")
-            prompt += f"Human: {content.strip()}\n"
-        elif "<span style='color:#0a571f;'>ChatGPT:</span>" in entry:
-            content = entry.replace("<span style='color:#0a571f;'>ChatGPT:</span>\n", "")
-            prompt += f"ChatGPT: {content.strip()}\n"
-        else:
-            prompt += f"{entry.strip()}\n"
-    return prompt.strip()
+    lines = []
+    for role, tool_name, text in messages:
+        if role == "user":
+            lines.append(f"Human: {text.strip()}")
+        elif role == "assistant":
+            lines.append(f"ChatGPT: {text.strip()}")
+        elif role == "tool":
+            lines.append(f"**{tool_name}:** {text}".strip())
+    return '\n'.join(lines).strip()
 
 def generate_title_files(titles, output_dir, titles_per_file, prompt_text):
     """Generate .txt files with titles and ChatGPT prompt."""
@@ -133,10 +524,92 @@ def generate_title_files(titles, output_dir, titles_per_file, prompt_text):
         file_name = f"titles_part_{i+1}.txt"
         file_path = os.path.join(output_dir, file_name)
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(file_content)
+        write_text_file(file_path, file_content)
         print(f"Generated title file: {file_path}")
 
+def iter_conversations(input_file, chunk_size=1 << 20, bytes_read=None):
+    """Yield conversations one at a time from the top-level JSON array of an export file.
+
+    If bytes_read is a dict, bytes_read[input_file] is kept up to date with the number of bytes
+    read from the file so far, for progress reporting.
+    """
+    decoder = json.JSONDecoder()
+    whitespace = ' \t\n\r'
+    with open(input_file, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        pos = 0
+        eof = not buffer
+        # Skip leading whitespace and the opening bracket of the array
+        while True:
+            while pos < len(buffer) and buffer[pos] in whitespace:
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise json.JSONDecodeError("Expecting '[' at start of conversations export", buffer, pos)
+        pos += 1
+        after_value = False  # True once a conversation has been read and a ',' or ']' is due
+        allow_close = True   # False right after a ',' since a trailing comma is invalid JSON
+        read_size = chunk_size
+        while True:
+            while pos < len(buffer) and buffer[pos] in whitespace:
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    raise json.JSONDecodeError("Unterminated conversations array", buffer, pos)
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            char = buffer[pos]
+            if char == ']' and allow_close:
+                return
+            if char == ',' and after_value:
+                pos += 1
+                after_value = allow_close = False
+                continue
+            if after_value:
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The object spans past the buffer; read more, growing the read size so that
+                # very large conversations are not re-parsed once per chunk
+                chunk = f.read(read_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                read_size *= 2
+                continue
+            read_size = chunk_size
+            if bytes_read is not None:
+                bytes_read[input_file] = f.buffer.tell()
+            # raw_decode can stop early on a number cut at the chunk boundary
+            if end == len(buffer) and not eof and not isinstance(item, (dict, list, str)):
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            pos = end
+            after_value = allow_close = True
+            # Drop the consumed prefix so memory stays bounded by the largest conversation
+            if pos >= chunk_size:
+                buffer, pos = buffer[pos:], 0
+            yield item
+
+def load_conversations(input_files, bytes_read=None):
+    """Stream conversations from all input files in order."""
+    for input_file in input_files:
+        try:
+            yield from iter_conversations(input_file, bytes_read=bytes_read)
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON from file '{input_file}': {e}")
+            sys.exit(1)
+        print(f"Loaded conversations from: {input_file}")
+
 def load_categories_from_json(categories_json_files):
     """Load title-category mappings from JSON files."""
     categories_mapping = {}
@@ -158,8 +631,911 @@ def load_categories_from_json(categories_json_files):
                 print(f"Error decoding JSON from file '{file}': {e}")
     return categories_mapping
 
-def main():
-    """Main function to process the conversations."""
+def categorize_conversation(messages, title_sanitized, context):
+    """Categorize a conversation by content and title keywords, falling back to 'Unprocessed'."""
+    keywords_mapping = context['keywords_mapping']
+    keywords_matcher = context['keywords_matcher']
+    category = None
+    # First, try categorizing by content keywords
+    if context['categorize_by_keywords']:
+        if messages is not None:
+            conversation_text = get_conversation_text(messages)
+            category = categorize_by_keywords_in_text(conversation_text, keywords_mapping, keywords_matcher)
+
+    # If categorization by content keywords fails, try categorizing by title keywords
+    if not category and context['categorize_by_title']:
+        # Try to categorize based on title keywords
+        category = categorize_by_keywords_in_text(title_sanitized, keywords_mapping, keywords_matcher)
+
+    # If still no category, assign 'Unprocessed'
+    return category or 'Unprocessed'
+
+def move_conversation_files(previous, file_path, prompt_file_path, output_dir, verbose=False):
+    """Move an unchanged conversation's files to their new location, e.g. after a category change."""
+    old_file_path = os.path.join(output_dir, previous['file_path'])
+    old_prompt_file_path = os.path.join(output_dir, previous['prompt_path'])
+    try:
+        os.replace(old_file_path, file_path)
+        os.replace(old_prompt_file_path, prompt_file_path)
+    except OSError as e:
+        print(f"Error moving '{old_file_path}': {e}")
+        return False
+    remove_empty_folders(os.path.dirname(old_file_path), output_dir)
+    if verbose:
+        print(f"Moved conversation to: {file_path}")
+    return True
+
+def remove_conversation_files(previous, output_dir):
+    """Remove the files a changed conversation was previously written to."""
+    for key in ('file_path', 'prompt_path'):
+        old_path = os.path.join(output_dir, previous[key])
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing '{old_path}': {e}")
+    remove_empty_folders(os.path.dirname(os.path.join(output_dir, previous['file_path'])), output_dir)
+
+def remove_empty_folders(folder, output_dir):
+    """Remove a folder and its empty parents, stopping at the output directory."""
+    output_dir = os.path.abspath(output_dir)
+    folder = os.path.abspath(folder)
+    while folder != output_dir and folder.startswith(output_dir + os.sep):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            return  # Not empty
+        folder = os.path.dirname(folder)
+
+def add_text_data(result, item, messages, manifest_entry, previous, context, timings):
+    """Attach the data derived from the conversation text: search text, similarity and classifier features."""
+    search_state = context['search_index']
+    needs_search_text = search_state is not None and \
+        search_state.get(result['id']) != (manifest_entry['fingerprint'], manifest_entry['file_path'])
+    needs_similarity = context['similarity']
+    needs_terms = context['classify']
+    # Unchanged content: reuse the features computed by the previous run
+    reusable = previous is not None and previous['fingerprint'] == manifest_entry['fingerprint'] and not context['force']
+    if needs_similarity and reusable and 'minhash' in previous:
+        manifest_entry['text_hash'] = previous['text_hash']
+        manifest_entry['minhash'] = previous['minhash']
+        needs_similarity = False
+    if needs_terms and reusable and 'terms' in previous:
+        manifest_entry['terms'] = previous['terms']
+        needs_terms = False
+    if not (needs_search_text or needs_similarity or needs_terms):
+        return
+    if messages is None:
+        messages = timed(timings, 'traverse', build_conversation_messages, item, context)
+    if messages is None:
+        return
+    conversation_text = get_conversation_text(messages)
+    if needs_search_text:
+        result['search_text'] = conversation_text
+    if needs_similarity:
+        start = time.perf_counter()
+        manifest_entry['text_hash'] = hashlib.sha256(conversation_text.encode('utf-8')).hexdigest()[:16] if conversation_text.strip() else None
+        manifest_entry['minhash'] = minhash_signature(conversation_text)
+        if timings is not None:
+            record_stage(timings, 'similarity', start)
+    if needs_terms:
+        manifest_entry['terms'] = timed(timings, 'terms', extract_terms, conversation_text)
+
+def record_stage(stages, stage, start):
+    """Add the wall time since start and one call to a profiled stage."""
+    totals = stages.setdefault(stage, [0.0, 0])
+    totals[0] += time.perf_counter() - start
+    totals[1] += 1
+
+def timed(timings, stage, func, *args):
+    """Call func, recording its wall time under stage unless timings is None."""
+    if timings is None:
+        return func(*args)
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        record_stage(timings, stage, start)
+
+def process_conversation(item, context):
+    """Categorize, render and write a single conversation, returning its index data."""
+    if not context['profile']:
+        return export_conversation(item, context, None)
+    timings = {}
+    start = time.perf_counter()
+    result = export_conversation(item, context, timings)
+    if result is not None:
+        result['timings'] = timings
+        result['seconds'] = time.perf_counter() - start
+    return result
+
+def export_conversation(item, context, timings):
+    """Export a single conversation, recording per-stage wall times in timings when profiling."""
+    title = item.get("title")
+    if not title:
+        return None  # Skip if no title
+    title_sanitized, datetime_obj, folder_name, file_stem = get_conversation_names(item, context['export_datetime'])
+    output_dir = context['output_dir']
+    conversation_id = get_conversation_id(item, title_sanitized)
+    fingerprint = timed(timings, 'fingerprint', conversation_fingerprint, item)
+    previous = context['manifest'].get(conversation_id)
+    unchanged = previous is not None and previous['fingerprint'] == fingerprint
+    result = {'title': title_sanitized, 'category': None, 'unprocessed': False, 'entry': None,
+              'id': conversation_id, 'manifest_entry': None, 'search_text': None, 'written': False}
+
+    messages = None
+
+    # Assign category from categories_file if available, otherwise reuse the category
+    # computed for this exact content by the last run when the keyword settings are the same
+    auto_category = None
+    classified_category = None
+    if title_sanitized in context['categories_mapping']:
+        category = context['categories_mapping'][title_sanitized]
+    else:
+        if unchanged and context['reuse_categories'] and previous.get('auto_category'):
+            auto_category = previous['auto_category']
+        else:
+            if context['categorize_by_keywords']:
+                messages = timed(timings, 'traverse', build_conversation_messages, item, context)
+            auto_category = timed(timings, 'categorize', categorize_conversation, messages, title_sanitized, context)
+        category = auto_category
+        # Keep the category the classifier assigned last run while its inputs are unchanged
+        if category == 'Unprocessed' and unchanged and context['reuse_classification'] and previous.get('classified_category'):
+            category = classified_category = previous['classified_category']
+        result['unprocessed'] = category == 'Unprocessed'
+    result['category'] = category
+
+    if not item.get("create_time"):
+        print(f"Warning: 'create_time' not found for conversation '{title}'. Using current time.")
+
+    category_folder = os.path.join(output_dir, category)
+    conversation_folder = os.path.join(category_folder, folder_name)
+    file_path, prompt_file_path = generate_unique_filename(conversation_folder, item, file_stem)
+    relative_file_path = os.path.relpath(file_path, output_dir)
+    relative_prompt_path = os.path.relpath(prompt_file_path, output_dir)
+    # Never move or write onto a note that the manifest records for another conversation
+    if context['path_owners'].get(relative_file_path, conversation_id) != conversation_id:
+        print(f"Error: Not exporting '{title}': '{relative_file_path}' belongs to another conversation.")
+        return result
+
+    manifest_entry = {
+        'fingerprint': fingerprint,
+        'auto_category': auto_category,
+        'file_path': relative_file_path,
+        'prompt_path': relative_prompt_path,
+    }
+    if classified_category:
+        manifest_entry['classified_category'] = classified_category
+
+    # Skip unchanged conversations whose files are already in place
+    if unchanged and not context['force']:
+        same_paths = previous['file_path'] == relative_file_path and previous['prompt_path'] == relative_prompt_path
+        # Collapsed duplicates have no files of their own
+        collapsed = context['collapse_duplicates'] and previous.get('duplicate_of')
+        if same_paths and (collapsed or (os.path.isfile(file_path) and os.path.isfile(prompt_file_path))):
+            if collapsed:
+                result['item'] = item  # Needed to write its note if it is no longer a duplicate
+            result['entry'] = dict(previous['entry'], file_path=file_path)
+            manifest_entry['entry'] = previous['entry']
+            if 'related_section' in previous:
+                manifest_entry['related_section'] = previous['related_section']  # Still at the end of the note
+            result['manifest_entry'] = manifest_entry
+            add_text_data(result, item, messages, manifest_entry, previous, context, timings)
+            return result
+
+    # Create category folder within output_dir
+    if timed(timings, 'write', ensure_folder, category_folder, context['known_folders']) and context['verbose']:
+        print(f"Created category folder: {category_folder}")
+
+    # Create conversation folder within category
+    if timed(timings, 'write', ensure_folder, conversation_folder, context['known_folders']) and context['verbose']:
+        print(f"Created conversation folder: {conversation_folder}")
+
+    moved = False
+    if previous is not None and (previous['file_path'] != relative_file_path or previous['prompt_path'] != relative_prompt_path):
+        if unchanged and not context['force']:
+            moved = timed(timings, 'write', move_conversation_files, previous, file_path, prompt_file_path,
+                          output_dir, context['verbose'])
+        else:
+            timed(timings, 'write', remove_conversation_files, previous, output_dir)
+
+    if moved:
+        entry = dict(previous['entry'])
+    else:
+        # Extract conversation content for output, reusing the model built for categorization
+        if messages is None:
+            messages = timed(timings, 'traverse', build_conversation_messages, item, context)
+        if messages is None:
+            print(f"Error: Could not find root node for conversation '{title}'")
+            return result
+
+        if context['verbose']:
+            print(f"Writing conversation '{title}' to: {file_path}")
+        markdown = timed(timings, 'render', render_conversation, messages)
+        timed(timings, 'write', write_text_file, file_path, markdown)
+
+        # Generate ChatGPT prompt and save it
+        prompt = timed(timings, 'render', generate_chatgpt_prompt, messages)
+        timed(timings, 'write', write_text_file, prompt_file_path, prompt)
+        if context['verbose']:
+            print(f"Generated ChatGPT prompt file: {prompt_file_path}")
+
+        # Use the conversation's own update time, falling back to the time of this export
+        update_time = item.get("update_time")
+        if update_time:
+            updated_str = datetime.fromtimestamp(update_time).strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            updated_str = context['export_time']
+
+        # Conversations whose content changed since a previous run are marked as updated
+        datetime_str = datetime_obj.strftime('%Y-%m-%d %H:%M:%S')
+        entry = {
+            'title': title_sanitized,
+            'created': datetime_str,
+            'updated': updated_str,
+            'messages': len(messages),
+            'status': '🤖' if previous is None else previous['entry'].get('status', '🤖') if unchanged else '🔄'
+        }
+
+    # Add to categorized conversations for indexing
+    result['entry'] = dict(entry, file_path=file_path)
+    manifest_entry['entry'] = entry
+    if moved and 'related_section' in previous:
+        manifest_entry['related_section'] = previous['related_section']  # Moved notes keep their content
+    result['manifest_entry'] = manifest_entry
+    result['written'] = not moved
+    add_text_data(result, item, messages, manifest_entry, previous, context, timings)
+    return result
+
+def init_worker(context):
+    """Store the shared run context in a pool worker process."""
+    global WORKER_CONTEXT
+    WORKER_CONTEXT = context
+
+def process_conversation_batch(items):
+    """Process a batch of conversations inside a pool worker."""
+    return [process_conversation(item, WORKER_CONTEXT) for item in items]
+
+def process_conversations_in_pool(conversations, context, jobs, batch_size=16):
+    """Process conversations across a process pool, yielding results in input order."""
+    # Only a bounded number of batches is in flight so the input stream is not read ahead unbounded
+    max_pending = jobs * 2
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(context,)) as executor:
+        pending = deque()
+        batch = []
+        for item in conversations:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                pending.append(executor.submit(process_conversation_batch, batch))
+                batch = []
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+        if batch:
+            pending.append(executor.submit(process_conversation_batch, batch))
+        while pending:
+            yield from pending.popleft().result()
+
+def open_search_index(output_dir):
+    """Open the SQLite FTS5 search index in the output directory, creating it if needed."""
+    index_path = os.path.join(output_dir, SEARCH_INDEX_FILENAME)
+    connection = sqlite3.connect(index_path)
+    try:
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                rowid INTEGER PRIMARY KEY,
+                conversation_id TEXT UNIQUE NOT NULL,
+                fingerprint TEXT NOT NULL,
+                path TEXT NOT NULL,
+                title TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+                title, body, tokenize='unicode61 remove_diacritics 2'
+            );
+        """)
+    except sqlite3.OperationalError as e:
+        connection.close()
+        print(f"Error: Could not create search index '{index_path}' (SQLite FTS5 is required): {e}")
+        sys.exit(1)
+    return connection
+
+def load_search_index_state(connection):
+    """Return the fingerprint and note path of every indexed conversation, keyed by id."""
+    rows = connection.execute("SELECT conversation_id, fingerprint, path FROM conversations")
+    return {conversation_id: (fingerprint, path) for conversation_id, fingerprint, path in rows}
+
+def remove_from_search_index(connection, conversation_id):
+    """Remove a conversation from the search index, if present."""
+    row = connection.execute("SELECT rowid FROM conversations WHERE conversation_id = ?", (conversation_id,)).fetchone()
+    if row:
+        connection.execute("DELETE FROM conversations_fts WHERE rowid = ?", (row[0],))
+        connection.execute("DELETE FROM conversations WHERE rowid = ?", (row[0],))
+
+def update_search_index_path(connection, conversation_id, path):
+    """Record the new note path of a conversation whose files were moved."""
+    connection.execute("UPDATE conversations SET path = ? WHERE conversation_id = ?", (path, conversation_id))
+
+def update_search_index(connection, conversation_id, fingerprint, path, title, text):
+    """Insert or replace a conversation in the search index."""
+    row = connection.execute("SELECT rowid FROM conversations WHERE conversation_id = ?", (conversation_id,)).fetchone()
+    if row:
+        rowid = row[0]
+        connection.execute("UPDATE conversations SET fingerprint = ?, path = ?, title = ? WHERE rowid = ?",
+                           (fingerprint, path, title, rowid))
+        connection.execute("DELETE FROM conversations_fts WHERE rowid = ?", (rowid,))
+    else:
+        rowid = connection.execute("INSERT INTO conversations (conversation_id, fingerprint, path, title) VALUES (?, ?, ?, ?)",
+                                   (conversation_id, fingerprint, path, title)).lastrowid
+    connection.execute("INSERT INTO conversations_fts (rowid, title, body) VALUES (?, ?, ?)", (rowid, title, text))
+
+def search_conversations(output_dir, query, limit=20):
+    """Run an FTS5 query against the search index and return ranked (path, title, snippet) hits."""
+    index_path = os.path.join(output_dir, SEARCH_INDEX_FILENAME)
+    if not os.path.isfile(index_path):
+        print(f"Error: No search index found at '{index_path}'. Export with --search-index first.")
+        sys.exit(1)
+    connection = sqlite3.connect(index_path)
+    try:
+        # Matches in the title weigh more than matches in the body
+        return connection.execute("""
+            SELECT c.path, c.title, snippet(conversations_fts, 1, '**', '**', '…', 12)
+            FROM conversations_fts JOIN conversations c ON c.rowid = conversations_fts.rowid
+            WHERE conversations_fts MATCH ?
+            ORDER BY bm25(conversations_fts, 5.0, 1.0)
+            LIMIT ?
+        """, (query, limit)).fetchall()
+    finally:
+        connection.close()
+
+def search_main(argv):
+    """Search subcommand: query the full-text index of an exported vault."""
+    parser = argparse.ArgumentParser(prog='ChatGPT_to_Obsidian.py search', description='Search exported conversations.')
+    parser.add_argument('output_dir', help='Directory the conversations were exported to with --search-index')
+    parser.add_argument('query', nargs='+', help='Keywords, "quoted phrases" or any SQLite FTS5 query')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum number of results')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        hits = search_conversations(args.output_dir, ' '.join(args.query), args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"Error: Invalid search query: {e}")
+        sys.exit(1)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for rank, (path, title, snippet) in enumerate(hits, 1):
+        print(f"{rank}. {title}\n   {os.path.join(args.output_dir, path)}\n   {snippet}")
+    print(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms")
+
+def minhash_signature(text, num_perm=MINHASH_PERMUTATIONS):
+    """Compute a MinHash signature of the word 3-gram shingles of a text, or None if it has no words.
+
+    One-permutation hashing: each shingle hash is assigned to one of num_perm bins by its low
+    bits and the minimum of its high bits is kept per bin, so the cost is linear in the text.
+    Empty bins are filled from the next non-empty bin.
+    """
+    words = [zlib.crc32(word.encode('utf-8')) for word in re.findall(r'\w+', text.lower())]
+    if not words:
+        return None
+    if len(words) < 3:
+        shingles = set(words)
+    else:
+        shingles = {(a * 0x9E3779B97F4A7C15) ^ (b * 0xC2B2AE3D27D4EB4F) ^ (c * 0x165667B19E3779F9)
+                    for a, b, c in zip(words, words[1:], words[2:])}
+    mask = (1 << 64) - 1
+    signature = [None] * num_perm
+    for shingle in shingles:
+        # splitmix64 finalizer for well-distributed bits
+        h = shingle & mask
+        h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & mask
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & mask
+        h ^= h >> 31
+        position = h & (num_perm - 1)
+        value = h >> 32
+        if signature[position] is None or value < signature[position]:
+            signature[position] = value
+    for position in range(num_perm):
+        if signature[position] is None:
+            # Densification: borrow the next filled bin, offset by the distance to keep bins distinct
+            distance = 1
+            while signature[(position + distance) % num_perm] is None:
+                distance += 1
+            signature[position] = signature[(position + distance) % num_perm] + (distance << 32)
+    return signature
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimate the Jaccard similarity of two texts from their MinHash signatures."""
+    return sum(map(operator.eq, signature_a, signature_b)) / len(signature_a)
+
+def lsh_band_layout(threshold, num_perm=MINHASH_PERMUTATIONS):
+    """Choose (bands, rows) so that pairs at the similarity threshold very likely share a band."""
+    rows = num_perm
+    while rows > 1:
+        bands = num_perm // rows
+        # (1 / bands) ** (1 / rows) approximates the similarity at which half the pairs become candidates
+        if (1 / bands) ** (1 / rows) <= threshold * 0.75:
+            return bands, rows
+        rows //= 2
+    return num_perm, 1
+
+def find_related_conversations(signatures, threshold, limit, max_bucket=100):
+    """Find up to limit related conversations per signature with locality-sensitive hashing.
+
+    Signatures are split into bands; only conversations sharing a whole band are compared, so the
+    work grows with the number of candidate pairs instead of quadratically. Very large buckets,
+    e.g. from boilerplate text, are truncated to max_bucket members.
+    Returns {index: [(similarity, other_index), ...]} sorted by decreasing similarity.
+    """
+    bands, rows = lsh_band_layout(threshold)
+    candidates = set()
+    for band in range(bands):
+        start = band * rows
+        buckets = defaultdict(list)
+        for index, signature in enumerate(signatures):
+            buckets[tuple(signature[start:start + rows])].append(index)
+        for members in buckets.values():
+            members = members[:max_bucket]
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    candidates.add((first, second))
+    related = defaultdict(list)
+    for first, second in candidates:
+        similarity = estimate_similarity(signatures[first], signatures[second])
+        if similarity >= threshold:
+            related[first].append((similarity, second))
+            related[second].append((similarity, first))
+    return {index: sorted(pairs, key=lambda pair: (-pair[0], pair[1]))[:limit] for index, pairs in related.items()}
+
+def collapse_duplicate_conversations(records, context):
+    """Keep the first of each group of conversations with identical text and remove the others' files.
+
+    Returns the ids of the duplicates and the results of conversations that were collapsed by a
+    previous run but are no longer duplicates, whose notes are written again.
+    """
+    canonical_by_hash = {}
+    duplicate_ids = set()
+    for record in records:
+        manifest_entry = record['manifest_entry']
+        text_hash = manifest_entry.get('text_hash')
+        if not text_hash:
+            continue
+        canonical = canonical_by_hash.setdefault(text_hash, record)
+        # A conversation repeated in the input is the same conversation, not a duplicate of itself
+        if canonical['id'] == record['id']:
+            continue
+        manifest_entry['duplicate_of'] = canonical['id']
+        if record['id'] not in duplicate_ids:
+            duplicate_ids.add(record['id'])
+            canonical.setdefault('duplicate_titles', []).append(record['title'])
+        if manifest_entry['file_path'] != canonical['manifest_entry']['file_path']:
+            remove_conversation_files(manifest_entry, context['output_dir'])
+
+    rewritten = []
+    # Removing the duplicates' files may have deleted folders cached in known_folders
+    rewrite_context = dict(context, force=True, collapse_duplicates=False, known_folders={context['output_dir']})
+    for position, record in enumerate(records):
+        if record.get('item') is not None and record['id'] not in duplicate_ids:
+            result = process_conversation(record.pop('item'), rewrite_context)
+            result['duplicate_titles'] = record.get('duplicate_titles', [])
+            records[position] = result
+            rewritten.append(result)
+    return duplicate_ids, rewritten
+
+def render_related_section(links, duplicate_titles):
+    """Render the related conversations section appended to a note, or '' if there is nothing to link."""
+    if not links and not duplicate_titles:
+        return ''
+    lines = [RELATED_SECTION_MARKER]
+    for record, similarity in links:
+        relative_path = record['manifest_entry']['file_path'].replace('\\', '/')
+        label = 'near-duplicate, ' if similarity >= NEAR_DUPLICATE_SIMILARITY else ''
+        lines.append(f"- [[{relative_path}|{record['title']}]] ({label}{similarity:.0%} similar)\n")
+    if duplicate_titles:
+        lines.append(f"\nExact duplicates collapsed into this note: {', '.join(duplicate_titles)}\n")
+    return ''.join(lines)
+
+def update_related_section(file_path, section):
+    """Replace the related conversations section at the end of a note."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    marker_position = content.rfind(RELATED_SECTION_MARKER)
+    if marker_position != -1:
+        content = content[:marker_position]
+    write_text_file(file_path, content + section)
+
+def link_related_conversations(records, threshold, limit):
+    """Write related-conversation links into notes whose related section changed.
+
+    With threshold None only collapsed duplicates are listed. Returns the number of notes with links.
+    """
+    candidates = [record for record in records if record['manifest_entry'].get('minhash')]
+    related = {}
+    if threshold is not None:
+        related = find_related_conversations([record['manifest_entry']['minhash'] for record in candidates],
+                                             threshold, limit)
+    candidate_positions = {id(record): index for index, record in enumerate(candidates)}
+    linked = 0
+    for record in records:
+        index = candidate_positions.get(id(record))
+        links = [(candidates[other], similarity) for similarity, other in related.get(index, [])]
+        section = render_related_section(links, record.get('duplicate_titles', []))
+        linked += bool(section)
+        set_related_section(record, section)
+    return linked
+
+def set_related_section(record, section):
+    """Replace the related section of a note if it differs from the one recorded in its manifest entry.
+
+    Freshly written notes have no section; skipped and moved notes keep the one recorded by the last run.
+    """
+    manifest_entry = record['manifest_entry']
+    if section != manifest_entry.get('related_section', ''):
+        try:
+            update_related_section(record['entry']['file_path'], section)
+        except OSError as e:
+            print(f"Error updating related links in '{record['entry']['file_path']}': {e}")
+            return
+    if section:
+        manifest_entry['related_section'] = section
+    else:
+        manifest_entry.pop('related_section', None)
+
+def extract_terms(text, limit=CLASSIFIER_TERMS):
+    """Return the most frequent words of a text as [word, count] pairs, the features of the classifier."""
+    counts = Counter(re.findall(r'[^\W\d_]{3,}', text.lower()))
+    return [[word, count] for word, count in counts.most_common(limit)]
+
+def build_term_matrix(term_lists):
+    """Stack term lists into a sparse document-term matrix in CSR form: (indptr, indices, counts, vocabulary size)."""
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    counts = []
+    for terms in term_lists:
+        for word, count in terms:
+            indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+    return indptr, indices, counts, len(vocabulary)
+
+def nearest_centroids_numpy(matrix, labels, label_count):
+    """Score documents against the TF-IDF centroid of every label with batched array operations.
+
+    labels holds the label of each seed document and -1 for each document to classify. Returns the
+    most similar label and its cosine similarity per document (0 for seed documents).
+    """
+    indptr, indices, counts, vocabulary_size = matrix
+    document_count = len(indptr) - 1
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    rows = numpy.repeat(numpy.arange(document_count), numpy.diff(indptr))
+    # Sublinear term frequency times smoothed inverse document frequency, L2-normalised per document
+    idf = numpy.log((1 + document_count) / (1 + numpy.bincount(indices, minlength=vocabulary_size))) + 1
+    values = (1 + numpy.log(numpy.asarray(counts, dtype=float))) * idf[indices]
+    values /= numpy.sqrt(numpy.bincount(rows, weights=values * values, minlength=document_count))[rows]
+    row_labels = numpy.asarray(labels, dtype=numpy.int64)[rows]
+    seeded = row_labels >= 0
+    centroids = numpy.zeros((label_count, vocabulary_size))
+    numpy.add.at(centroids, (row_labels[seeded], indices[seeded]), values[seeded])
+    norms = numpy.linalg.norm(centroids, axis=1, keepdims=True)
+    centroids /= numpy.where(norms > 0, norms, 1)
+    pending = ~seeded
+    scores = numpy.zeros((document_count, label_count))
+    numpy.add.at(scores, rows[pending], values[pending, None] * centroids[:, indices[pending]].T)
+    best = scores.argmax(axis=1)
+    return best.tolist(), scores[numpy.arange(document_count), best].tolist()
+
+def nearest_centroids_python(matrix, labels, label_count):
+    """Pure-Python equivalent of nearest_centroids_numpy, used when NumPy is not installed."""
+    indptr, indices, counts, vocabulary_size = matrix
+    document_count = len(indptr) - 1
+    document_frequency = [0] * vocabulary_size
+    for index in indices:
+        document_frequency[index] += 1
+    idf = [math.log((1 + document_count) / (1 + frequency)) + 1 for frequency in document_frequency]
+    values = [(1 + math.log(count)) * idf[index] for index, count in zip(indices, counts)]
+    for document in range(document_count):
+        start, end = indptr[document], indptr[document + 1]
+        norm = math.sqrt(sum(value * value for value in values[start:end]))
+        for position in range(start, end):
+            values[position] /= norm
+    centroids = [defaultdict(float) for _ in range(label_count)]
+    for document, label in enumerate(labels):
+        if label >= 0:
+            centroid = centroids[label]
+            for position in range(indptr[document], indptr[document + 1]):
+                centroid[indices[position]] += values[position]
+    for centroid in centroids:
+        norm = math.sqrt(sum(value * value for value in centroid.values())) or 1
+        for index in centroid:
+            centroid[index] /= norm
+    best_labels = [0] * document_count
+    best_scores = [0.0] * document_count
+    for document, label in enumerate(labels):
+        if label < 0:
+            positions = range(indptr[document], indptr[document + 1])
+            scores = [sum(centroid.get(indices[position], 0.0) * values[position] for position in positions)
+                      for centroid in centroids]
+            best_labels[document] = max(range(label_count), key=scores.__getitem__)
+            best_scores[document] = scores[best_labels[document]]
+    return best_labels, best_scores
+
+def move_classified_conversation(record, category, context):
+    """Move an Unprocessed conversation's files into the folder of the category it was classified into."""
+    output_dir = context['output_dir']
+    manifest_entry = record['manifest_entry']
+    # Paths are <category>/<date-hash>/<file>; only the category folder changes
+    relative_file_path = os.path.join(category, manifest_entry['file_path'].split(os.sep, 1)[1])
+    relative_prompt_path = os.path.join(category, manifest_entry['prompt_path'].split(os.sep, 1)[1])
+    file_path = os.path.join(output_dir, relative_file_path)
+    ensure_folder(os.path.join(output_dir, category), context['known_folders'])
+    ensure_folder(os.path.dirname(file_path), context['known_folders'])
+    if not move_conversation_files(manifest_entry, file_path, os.path.join(output_dir, relative_prompt_path),
+                                   output_dir, context['verbose']):
+        return False
+    manifest_entry.update(file_path=relative_file_path, prompt_path=relative_prompt_path, classified_category=category)
+    record['category'] = category
+    record['entry']['file_path'] = file_path
+    return True
+
+def classify_unprocessed_conversations(records, context, threshold):
+    """Move Unprocessed conversations into the category whose TF-IDF centroid they are most similar to.
+
+    Conversations categorized by a categories file or by keywords seed the centroids, and all
+    Unprocessed conversations are scored in one batch. Returns the classified records.
+    """
+    categories = []
+    category_labels = {}
+    labels = []
+    features = []
+    for record in records:
+        if not record['manifest_entry'].get('terms') or record['manifest_entry'].get('classified_category'):
+            continue  # No text, or already classified by a previous run; neither seeds a centroid
+        if record['category'] == 'Unprocessed':
+            labels.append(-1)
+        else:
+            if record['category'] not in category_labels:
+                category_labels[record['category']] = len(categories)
+                categories.append(record['category'])
+            labels.append(category_labels[record['category']])
+        features.append(record)
+    if not categories or -1 not in labels:
+        return []
+    matrix = build_term_matrix([record['manifest_entry']['terms'] for record in features])
+    nearest_centroids = nearest_centroids_numpy if numpy is not None else nearest_centroids_python
+    best_labels, best_scores = nearest_centroids(matrix, labels, len(categories))
+    classified = []
+    for record, label, best_label, score in zip(features, labels, best_labels, best_scores):
+        if label < 0 and score >= threshold and move_classified_conversation(record, categories[best_label], context):
+            classified.append(record)
+    return classified
+
+def timed_conversations(conversations, stages):
+    """Yield conversations from a stream, recording the time spent reading them as the load stage."""
+    iterator = iter(conversations)
+    end = object()
+    while True:
+        start = time.perf_counter()
+        item = next(iterator, end)
+        record_stage(stages, 'load', start)
+        if item is end:
+            return
+        yield item
+
+def add_to_profile(profile, result, slowest_count=10):
+    """Merge a conversation's stage timings into the run profile and track the slowest ones."""
+    for stage, (seconds, calls) in result['timings'].items():
+        totals = profile['conversation_stages'].setdefault(stage, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += calls
+    entry = result['entry'] or {}
+    profile['count'] += 1
+    item = (result['seconds'], profile['count'], result['title'], result['category'], entry.get('messages', 0))
+    if len(profile['slowest']) < slowest_count:
+        heapq.heappush(profile['slowest'], item)
+    else:
+        heapq.heappushpop(profile['slowest'], item)
+
+def print_profile_summary(profile, total_seconds):
+    """Print wall time and call counts per stage and the slowest conversations."""
+    count = profile['count']
+    rate = count / total_seconds if total_seconds else 0.0
+    print(f"\nProfile: {count} conversations in {total_seconds:.2f} s ({rate:.1f} conversations/s)")
+    # Per-conversation stages run in the worker processes with --jobs, so their times are summed
+    # over all workers and their share is of the workers' combined wall time
+    workers = max(profile['jobs'], 1)
+    if workers > 1:
+        print(f"Stages marked * are summed over {workers} worker processes; their share is of {workers} × wall time.")
+    rows = [(stage, seconds, calls, total_seconds) for stage, (seconds, calls) in profile['stages'].items()]
+    rows += [(stage + ('*' if workers > 1 else ''), seconds, calls, total_seconds * workers)
+             for stage, (seconds, calls) in profile['conversation_stages'].items()]
+    print(f"{'Stage':<14}{'Total s':>10}{'Calls':>10}{'Avg ms':>10}{'Share':>8}")
+    for stage, seconds, calls, capacity in sorted(rows, key=lambda row: -row[1]):
+        share = seconds / capacity * 100 if capacity else 0.0
+        print(f"{stage:<14}{seconds:>10.3f}{calls:>10}{seconds / calls * 1000:>10.3f}{share:>7.1f}%")
+    if profile['slowest']:
+        print("Slowest conversations:")
+        for rank, (seconds, _, title, category, messages) in enumerate(sorted(profile['slowest'], reverse=True), 1):
+            print(f"{rank:>3}. {seconds * 1000:9.1f} ms  {title} ({category}, {messages} messages)")
+
+def report_progress(progress, count, final=False):
+    """Rewrite a single status line with throughput and estimated time remaining."""
+    now = time.perf_counter()
+    if not final and now - progress['last_report'] < 0.5:
+        return
+    progress['last_report'] = now
+    elapsed = now - progress['start']
+    line = f"Processed {count} conversations | {count / elapsed if elapsed else 0.0:.1f} conversations/s"
+    bytes_read = sum(progress['bytes_read'].values())
+    if progress['total_bytes'] and bytes_read:
+        fraction = min(bytes_read / progress['total_bytes'], 1.0)
+        eta = timedelta(seconds=int(elapsed * (1 - fraction) / fraction))
+        line += f" | {fraction:.0%} | ETA {eta}"
+    sys.stdout.write('\r' + line.ljust(progress['width']))
+    progress['width'] = len(line)
+    if final:
+        sys.stdout.write('\n')
+    sys.stdout.flush()
+
+def find_inbox_exports(inbox_dir):
+    """Return the size and modification time of every export (.json) and archive (.zip) in the inbox."""
+    exports = {}
+    with os.scandir(inbox_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and not entry.name.startswith('.') and entry.name.lower().endswith(('.json', '.zip')):
+                stat = entry.stat()
+                exports[entry.path] = (stat.st_size, stat.st_mtime)
+    return exports
+
+def extract_export_archive(archive_path, staging_dir):
+    """Extract conversations.json from a ChatGPT export archive into the staging folder and return its path."""
+    with zipfile.ZipFile(archive_path) as archive:
+        members = [name for name in archive.namelist() if os.path.basename(name) == 'conversations.json']
+        if not members:
+            raise ValueError("no conversations.json in the archive")
+        os.makedirs(staging_dir, exist_ok=True)
+        staged_path = os.path.join(staging_dir, os.path.splitext(os.path.basename(archive_path))[0] + '.json')
+        with archive.open(members[0]) as source, open(staged_path + '.tmp', 'wb') as target:
+            shutil.copyfileobj(source, target, 1 << 20)
+    os.replace(staged_path + '.tmp', staged_path)
+    return staged_path
+
+def move_inbox_exports(paths, folder):
+    """Move exports out of the inbox into a subfolder, prefixing their names with the current time."""
+    if not paths:
+        return
+    os.makedirs(folder, exist_ok=True)
+    prefix = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    for path in paths:
+        os.replace(path, os.path.join(folder, f"{prefix}_{os.path.basename(path)}"))
+
+def run_inbox_export(input_files, export_argv):
+    """Run one export of the given files with the watch command's export options; return whether it succeeded."""
+    try:
+        run_export(create_parser().parse_args(input_files + export_argv))
+    except SystemExit as e:  # Unreadable input files end the export with sys.exit
+        return e.code in (None, 0)
+    except Exception as e:  # Keep watching after an unexpected error in one export
+        print(f"Error: Export of {', '.join(input_files)} failed: {e}")
+        return False
+    return True
+
+def is_readable_export(input_file):
+    """Return whether an export file can be read as a list of conversations."""
+    try:
+        for _ in iter_conversations(input_file):
+            pass
+    except (OSError, ValueError) as e:  # Also covers JSONDecodeError and UnicodeDecodeError
+        print(f"Error: Could not read '{input_file}': {e}")
+        return False
+    return True
+
+def export_inbox_batch(inbox_dir, paths, export_argv):
+    """Export a batch of inbox files in one run, then move them to the processed or failed folder.
+
+    If the batch fails, the files that cannot be read are set aside and the others are exported
+    together in a second run, so one broken export does not hold back the others and index.md
+    still covers the whole batch.
+    """
+    staging_dir = os.path.join(inbox_dir, '.staging')
+    input_files = {}
+    failed = []
+    for path in sorted(paths, key=os.path.getmtime):
+        if path.lower().endswith('.zip'):
+            try:
+                input_files[path] = extract_export_archive(path, staging_dir)
+            # zipfile also raises NotImplementedError (unsupported compression), RuntimeError (encrypted)
+            # and EOFError (truncated data) for archives it cannot read
+            except (OSError, ValueError, zipfile.BadZipFile, NotImplementedError, RuntimeError, EOFError) as e:
+                print(f"Error: Could not read archive '{path}': {e}")
+                failed.append(path)
+        else:
+            input_files[path] = path
+    processed = []
+    if input_files:
+        print(f"Exporting {len(input_files)} new file(s) from the inbox...")
+        if run_inbox_export(list(input_files.values()), export_argv):
+            processed = list(input_files)
+        else:
+            readable = [path for path, input_file in input_files.items() if is_readable_export(input_file)]
+            if 0 < len(readable) < len(input_files):
+                print(f"Exporting the {len(readable)} readable file(s) again...")
+                if run_inbox_export([input_files[path] for path in readable], export_argv):
+                    processed = readable
+            failed.extend(path for path in input_files if path not in processed)
+    for path, input_file in input_files.items():
+        if input_file != path and os.path.isfile(input_file):
+            os.remove(input_file)
+    move_inbox_exports(processed, os.path.join(inbox_dir, 'processed'))
+    move_inbox_exports(failed, os.path.join(inbox_dir, 'failed'))
+    if failed:
+        print(f"Moved {len(failed)} export(s) that could not be processed to: {os.path.join(inbox_dir, 'failed')}")
+
+async def export_inbox_queue(queue, inbox_dir, export_argv, queued):
+    """Export queued inbox files one batch at a time; files queued during an export form the next batch."""
+    loop = asyncio.get_running_loop()
+    while True:
+        paths = [await queue.get()]
+        while not queue.empty():
+            paths.append(queue.get_nowait())
+        try:
+            # Exports block on parsing and writing, so they run in a worker thread and the event loop keeps polling
+            await loop.run_in_executor(None, export_inbox_batch, inbox_dir,
+                                       [path for path in paths if os.path.isfile(path)], export_argv)
+        except Exception as e:  # An error in one batch must not stop the exports of later files
+            print(f"Error: Could not process inbox files: {e}")
+        finally:
+            for path in paths:
+                queued.discard(path)
+                queue.task_done()
+
+async def watch_inbox(inbox_dir, export_argv, interval, once=False):
+    """Poll the inbox for new exports and hand them to the exporter as soon as they are completely written."""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    queued = set()
+    exporter = asyncio.create_task(export_inbox_queue(queue, inbox_dir, export_argv, queued))
+    previous = {}
+    try:
+        while True:
+            current = await loop.run_in_executor(None, find_inbox_exports, inbox_dir)
+            for path, signature in current.items():
+                # A file still being copied or downloaded changes size or modification time between polls
+                if path not in queued and (once or previous.get(path) == signature):
+                    queued.add(path)
+                    queue.put_nowait(path)
+            previous = current
+            if once:
+                await queue.join()
+                return
+            await asyncio.sleep(interval)
+    finally:
+        exporter.cancel()
+
+def watch_main(argv):
+    """Watch subcommand: export new ChatGPT exports dropped into an inbox directory."""
+    parser = argparse.ArgumentParser(prog='ChatGPT_to_Obsidian.py watch',
+                                     description='Watch a directory for new ChatGPT exports (conversations.json files or .zip archives) and export them incrementally.',
+                                     epilog='Other options, e.g. --categorize-by-keywords or --jobs, are passed on to the export.')
+    parser.add_argument('inbox_dir', help='Directory to watch for new exports')
+    parser.add_argument('output_dir', help='Directory to save output Markdown files')
+    parser.add_argument('--interval', type=float, default=5.0, help='Seconds between checks of the inbox')
+    parser.add_argument('--once', action='store_true', help='Export the files currently in the inbox and exit')
+    args, export_options = parser.parse_known_args(argv)
+    export_argv = [args.output_dir] + export_options
+    # Check the export options now rather than when the first export arrives
+    create_parser().parse_args(['conversations.json'] + export_argv)
+
+    if not os.path.isdir(args.inbox_dir):
+        os.makedirs(args.inbox_dir)
+        print(f"Created inbox directory: {args.inbox_dir}")
+    if not args.once:
+        print(f"Watching '{args.inbox_dir}' for new exports. Press Ctrl+C to stop.")
+    try:
+        asyncio.run(watch_inbox(args.inbox_dir, export_argv, args.interval, args.once))
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+def create_parser():
+    """Create the command-line parser of the export."""
     parser = argparse.ArgumentParser(description='Organize ChatGPT conversations into Obsidian-compatible Markdown files.')
 
     # Positional arguments
@@ -176,62 +1552,80 @@ def main():
     # New option for generating titles .txt files
     parser.add_argument('--split-titles', type=int, help='Number of titles per .txt file for ChatGPT prompts')
 
+    # Output options
+    parser.add_argument('--active-branch', action='store_true', help='Export only the branch ending at the current message, skipping edited or regenerated branches')
+
+    parser.add_argument('--classify', action='store_true', help='Move Unprocessed conversations into the most similar category (TF-IDF)')
+    parser.add_argument('--classify-threshold', type=float, default=0.2, help='Minimum cosine similarity (0-1) to a category for --classify')
+    parser.add_argument('--index-pages', choices=['month', 'rows'], help='Write a short index.md with counts per category and paged category indexes, split by month or by --index-page-size rows')
+    parser.add_argument('--index-page-size', type=int, default=500, help='Rows per category index page with --index-pages rows')
+    parser.add_argument('--related', action='store_true', help='Add links to related and near-duplicate conversations to each note')
+    parser.add_argument('--related-threshold', type=float, default=0.3, help='Minimum estimated similarity (0-1) for a related conversation')
+    parser.add_argument('--related-limit', type=int, default=5, help='Maximum number of related conversations linked from a note')
+    parser.add_argument('--collapse-duplicates', action='store_true', help='Keep only the first of several conversations with identical text')
+    parser.add_argument('--search-index', action='store_true', help='Build a full-text search index in the output directory for the search subcommand')
+
+    # Performance options
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes for rendering conversations')
+
+    parser.add_argument('--force', action='store_true', help='Rewrite all conversations, even those unchanged since the last run')
+    parser.add_argument('--profile', action='store_true', help='Report wall time and call counts per stage and the slowest conversations')
+    parser.add_argument('--profile-output', help='Save cProfile statistics of the main process to this file')
+
     # Other options
+    parser.add_argument('--verbose', action='store_true', help='Print a line for every folder and file written')
     parser.add_argument('--unprocessed-file', default='unprocessed.txt', help='File to save unprocessed titles')
 
     # Test mode (can be implemented as needed)
     parser.add_argument('--test', action='store_true', help='Enable test mode')
+    return parser
 
-    args = parser.parse_args()
-
+def run_export(args):
+    """Export the conversations in args.input_files to args.output_dir."""
     # Check if output_dir exists, create if not
     if not os.path.isdir(args.output_dir):
         os.makedirs(args.output_dir)
         print(f"Created output directory: {args.output_dir}")
 
-    data = []
     for input_file in args.input_files:
         if not os.path.isfile(input_file):
             print(f"Error: Input file '{input_file}' does not exist.")
             sys.exit(1)
-        with open(input_file, 'r', encoding='utf-8') as f:
-            try:
-                data.extend(json.load(f))
-                print(f"Loaded conversations from: {input_file}")
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON from file '{input_file}': {e}")
-                sys.exit(1)
+
+    run_start = time.perf_counter()
+    profiler = None
+    if args.profile_output:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    # A live progress line replaces per-file output on terminals
+    progress = None
+    if sys.stdout.isatty() and not args.verbose:
+        progress = {
+            'start': run_start,
+            'last_report': run_start,
+            'bytes_read': {},
+            'total_bytes': sum(os.path.getsize(input_file) for input_file in args.input_files),
+            'width': 0,
+        }
+
+    # Conversations are streamed one at a time instead of loading whole exports into memory
+    data = load_conversations(args.input_files, progress['bytes_read'] if progress else None)
+    profile = None
+    if args.profile:
+        profile = {'stages': {}, 'conversation_stages': {}, 'slowest': [], 'count': 0, 'jobs': args.jobs}
+        data = timed_conversations(data, profile['stages'])
+    stages = profile['stages'] if profile else None
+    export_datetime = datetime.now()
 
     # Load categories mapping from JSON files if provided
     categories_mapping = {}
     if args.categories_file:
         categories_mapping = load_categories_from_json(args.categories_file)
 
-    # Integrated keywords mapping
-    keywords_mapping = {
-    'DevOps': ['devops', 'ci/cd', 'jenkins', 'kubernetes', 'docker', 'ansible', 'terraform', 'prometheus', 'grafana', 'gitlab', 'circleci', 'chef', 'puppet'],
-    'System Administration': ['mikrotik', 'nginx', 'ubuntu', 'server', 'zimbra', 'linux', 'windows server', 'active directory', 'dns', 'dhcp', 'apache', 'ftp', 'firewall', 'ssl', 'let\'s encrypt'],
-    'Development/Programming': ['python', 'bash', 'powershell', 'git', 'script', 'javascript', 'js', 'html', 'css', 'c#', 'java', 'ruby', 'php', 'go', 'rust', 'typescript', 'node.js', 'django', 'flask'],
-    'Web Development': ['html', 'css', 'javascript', 'js', 'react', 'angular', 'vue', 'node.js', 'express', 'wordpress', 'drupal', 'joomla', 'sass', 'bootstrap', 'tailwind', 'npm', 'webpack'],
-    'Database Management': ['sql', 'mysql', 'postgresql', 'mongodb', 'database', 'oracle', 'sql server', 'nosql', 'redis', 'cassandra', 'sqlite', 'dbms', 'schema', 'replication', 'sharding'],
-    'Networking': ['tcp', 'udp', 'vpn', 'firewall', 'routing', 'switching', 'cisco', 'network', 'ip', 'subnet', 'dhcp', 'lan', 'wan', 'bgp', 'ospf', 'icmp', 'nat', 'dhcp'],
-    'Cloud Computing': ['aws', 'azure', 'gcp', 'cloud', 'ec2', 's3', 'lambda', 'cloudformation', 'cloudwatch', 'docker', 'kubernetes', 'serverless', 'rds', 'load balancer', 'autoscaling', 'iam', 'terraform'],
-    'Security': ['rsa', 'aes', 'sha', 'encryption', 'cybersecurity', 'ssl', 'tls', 'firewall', 'vulnerability', 'penetration testing', 'hacking', 'malware', 'ransomware', 'phishing', 'ddos', 'brute force', 'zero-day', 'backdoor', 'keylogger', 'siem', 'ids', 'ips', 'soc', 'threat hunting'],
-    'Artificial Intelligence': ['ai', 'machine learning', 'deep learning', 'neural network', 'tensorflow', 'pytorch', 'nlp', 'computer vision', 'reinforcement learning', 'supervised learning', 'unsupervised learning', 'gpt', 'transformer', 'classification', 'regression', 'clustering', 'cnn', 'rnn'],
-    'Data Science': ['data science', 'data analysis', 'pandas', 'numpy', 'matplotlib', 'statistics', 'data visualization', 'regression', 'classification', 'clustering', 'big data', 'hadoop', 'spark', 'etl', 'data pipeline', 'data wrangling', 'jupyter', 'sql', 'excel'],
-    'Project Management': ['agile', 'scrum', 'kanban', 'project management', 'jira', 'confluence', 'trello', 'waterfall', 'pmp', 'scope', 'risk management', 'stakeholder', 'milestones', 'deliverables'],
-    'Personal Development': ['productivity', 'time management', 'self-improvement', 'career', 'motivation', 'leadership', 'communication', 'teamwork', 'emotional intelligence', 'problem solving', 'decision making'],
-    'Health and Wellness': ['health', 'fitness', 'nutrition', 'mental health', 'wellness', 'exercise', 'diet', 'vitamin', 'therapy', 'meditation', 'yoga', 'supplements', 'hydration', 'stress management'],
-    'Travel': ['visa', 'travel', 'passport', 'immigration', 'flight', 'hotel', 'tourism', 'itinerary', 'booking', 'customs', 'airport', 'baggage', 'trip', 'insurance', 'reagrupación familiar', 'permiso de trabajo', 'obtención ciudadanía'],
-    'Language Learning': ['english', 'spanish', 'russian', 'language', 'learning', 'grammar', 'vocabulary', 'ielts', 'toefl', 'esl', 'speaking', 'listening', 'writing', 'reading'],
-    'Hardware': ['raspberry pi', 'arduino', 'hardware', 'cpu', 'gpu', 'motherboard', 'ssd', 'hdd', 'ram', 'power supply', 'peripherals', 'usb', 'bios', 'overclocking', 'cooling', 'raspbian', 'firmware', 'pixel 8 pro', 'móviles'],
-    'E-Commerce': ['promo code', 'discount', 'free shipping', 'return policy', 'coupon', 'checkout', 'gift card', 'deal', 'sale'],
-    'Support and Troubleshooting': ['help desk', 'it support', 'troubleshoot', 'ticketing', 'incident management', 'escalation', 'remote support', 'system logs', 'error logs', 'patching', 'backup', 'restore', 'diagnostics', 'sla', 'downtime', 'uptime', 'root cause analysis', 'Touch Screen Confirmation'],
-    'Finance and Investment': ['dividends', 'capped amount', 'investment return', 'passive income', 'ganar €20,000', '€', '$', '£', '¥'],
-    'Entertainment': ['series de fantasía', 'películas', 'libros de fantasía', 'videojuegos', 'música', 'arte digital', 'streaming', 'comics', 'novelas gráficas'],
-    'Legal and Documentation': ['legal document', 'contract', 'agreement', 'terms and conditions', 'privacy policy', 'license', 'certification', 'visa application', 'residence permit', 'tax id', 'work permit', 'official document', 'notarized document', 'birth certificate'],
-    'Miscellaneous': []
-    }
+    # Integrated keywords mapping, compiled once for the whole run
+    keywords_mapping = KEYWORDS_MAPPING
+    keywords_matcher = compile_keywords_matcher(keywords_mapping)
 
     # Warn if categorize-by-keywords is enabled but keywords_mapping is empty
     if args.categorize_by_keywords and not keywords_mapping:
@@ -241,112 +1635,159 @@ def main():
     unprocessed_titles = []
     all_titles = []  # To collect all titles for generating title files
 
-    for item in data:
-        title = item.get("title")
-        if not title:
-            continue  # Skip if no title
-        title_sanitized = sanitize_filename(title)
-        all_titles.append(title_sanitized)
-        category = None
-
-        # Assign category from categories_file if available
-        if title_sanitized in categories_mapping:
-            category = categories_mapping[title_sanitized]
-        else:
-            # First, try categorizing by content keywords
-            if args.categorize_by_keywords:
-                conversation_text_list = []
-                root_node_id = next((node_id for node_id, node in item['mapping'].items() if node.get('parent') is None), None)
-                if root_node_id:
-                    get_conversation_text(root_node_id, item['mapping'], conversation_text_list)
-                    conversation_text = ' '.join(conversation_text_list)
-                    category = categorize_by_keywords_in_text(conversation_text, keywords_mapping)
-
-            # If categorization by content keywords fails, try categorizing by title keywords
-            if not category and args.categorize_by_title:
-                # Try to categorize based on title keywords
-                category = categorize_by_keywords_in_text(title_sanitized, keywords_mapping)
-
-            # If still no category, assign 'Unprocessed'
-            if not category:
-                category = 'Unprocessed'
-                unprocessed_titles.append(title_sanitized)
-
-        # Generate date and hash for folder name
-        create_time = item.get("create_time")
-        if not create_time:
-            print(f"Warning: 'create_time' not found for conversation '{title}'. Using current time.")
-            datetime_obj = datetime.now()
-        else:
-            datetime_obj = datetime.fromtimestamp(create_time)
-        date_str = datetime_obj.strftime('%Y-%m-%d')
-        hash_str = generate_hash(title_sanitized + str(create_time))
-        folder_name = f"{date_str}-{hash_str}"
-
-        # Create category folder within output_dir
-        category_folder = os.path.join(args.output_dir, category)
-        if not os.path.isdir(category_folder):
-            os.makedirs(category_folder)
-            print(f"Created category folder: {category_folder}")
-
-        # Create conversation folder within category
-        conversation_folder = os.path.join(category_folder, folder_name)
-        if not os.path.isdir(conversation_folder):
-            os.makedirs(conversation_folder)
-            print(f"Created conversation folder: {conversation_folder}")
-
-        # Extract conversation content for output
-        conversation_output = []
-        message_count = [0]  # Initialize message count
-        root_node_id = next((node_id for node_id, node in item['mapping'].items() if node.get('parent') is None), None)
-        if root_node_id is None:
-            print(f"Error: Could not find root node for conversation '{title}'")
-            continue
-        get_conversation(root_node_id, item['mapping'], conversation_output, message_count)
+    # Load the manifest of the previous run so unchanged conversations can be skipped
+    manifest = load_manifest(args.output_dir)
+    # File names are made unique here, before conversations are spread over worker processes
+    latest_copies = find_latest_copies(args.input_files) if len(args.input_files) > 1 else {}
+    claimed_names = get_claimed_names(manifest['conversations'])
+    data = claim_conversation_names(data, export_datetime, claimed_names, latest_copies)
+    settings = settings_fingerprint(keywords_mapping, args.categorize_by_keywords, args.categorize_by_title, args.active_branch)
+    # Changing how conversations are rendered invalidates every previously written file
+    render_settings = {'active_branch': args.active_branch}
+    # Classified categories are reused only while the seeds and threshold are the same
+    classifier_settings = hashlib.sha256(json.dumps([settings, categories_mapping, args.classify_threshold],
+                                                    sort_keys=True).encode('utf-8')).hexdigest() if args.classify else None
 
-        # Generate filename with datetime
-        datetime_iso = datetime_obj.strftime('%Y-%m-%d_%H-%M-%S')
-        file_path = generate_unique_filename(conversation_folder, title_sanitized, datetime_iso)
+    # Open the search index; conversations whose indexed text is stale are re-indexed
+    search_connection = None
+    search_state = None
+    if args.search_index:
+        search_connection = open_search_index(args.output_dir)
+        search_state = load_search_index_state(search_connection) if manifest.get('render') == render_settings else {}
 
-        print(f"Writing conversation '{title}' to: {file_path}")
-        with open(file_path, 'w', encoding='utf-8') as outfile:
-            outfile.write('\n'.join(conversation_output))
+    context = {
+        'output_dir': args.output_dir,
+        'known_folders': {args.output_dir},
+        'export_datetime': export_datetime,
+        'export_time': export_datetime.strftime('%Y-%m-%d %H:%M:%S'),
+        'verbose': args.verbose,
+        'profile': profile is not None,
+        'search_index': search_state,
+        'manifest': manifest['conversations'],
+        'path_owners': get_path_owners(manifest['conversations']),
+        'reuse_categories': manifest['settings'] == settings,
+        'force': args.force or manifest.get('render') != render_settings,
+        'similarity': args.related or args.collapse_duplicates,
+        'classify': args.classify,
+        'reuse_classification': args.classify and manifest.get('classifier') == classifier_settings,
+        'collapse_duplicates': args.collapse_duplicates,
+        'active_branch': args.active_branch,
+        'categories_mapping': categories_mapping,
+        'keywords_mapping': keywords_mapping,
+        'keywords_matcher': keywords_matcher,
+        'categorize_by_keywords': args.categorize_by_keywords,
+        'categorize_by_title': args.categorize_by_title,
+    }
+    if args.jobs > 1:
+        results = process_conversations_in_pool(data, context, args.jobs)
+    else:
+        results = (process_conversation(item, context) for item in data)
 
-        # Generate ChatGPT prompt and save it
-        prompt = generate_chatgpt_prompt(conversation_output)
-        prompt_file_path = os.path.join(conversation_folder, f"{datetime_iso}_{sanitize_filename(title)}_prompt.txt")
-        with open(prompt_file_path, 'w', encoding='utf-8') as prompt_file:
-            prompt_file.write(prompt)
-        print(f"Generated ChatGPT prompt file: {prompt_file_path}")
+    # Conversations not present in this run's input are kept in the manifest
+    manifest_conversations = dict(manifest['conversations'])
 
-        # Get the file's last modified time
-        try:
-            updated_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-            updated_str = updated_time.strftime('%Y-%m-%d %H:%M:%S')
-        except Exception as e:
-            print(f"Error getting modified time for '{file_path}': {e}")
-            updated_str = "Unknown"
+    # Results arrive in input order, so the index and unprocessed list match a serial run
+    processed_count = 0
+    records = []
+    for result in results:
+        if result is None:
+            continue
+        processed_count += 1
+        if progress:
+            report_progress(progress, processed_count)
+        if profile:
+            add_to_profile(profile, result)
+        all_titles.append(result['title'])
+        if result['manifest_entry'] is not None:
+            manifest_conversations[result['id']] = result['manifest_entry']
+        if result['unprocessed']:
+            unprocessed_titles.append((result['id'], result['title']))
+        if result['search_text'] is not None:
+            manifest_entry = result['manifest_entry']
+            timed(stages, 'search index', update_search_index, search_connection, result['id'],
+                  manifest_entry['fingerprint'], manifest_entry['file_path'], result['title'], result['search_text'])
+            result['search_text'] = None
+        if result['entry'] is not None:
+            records.append(result)
+    if progress:
+        report_progress(progress, processed_count, final=True)
 
-        # Add to categorized conversations for indexing
-        datetime_str = datetime_obj.strftime('%Y-%m-%d %H:%M:%S')
-        categorized_conversations[category].append({
-            'title': title_sanitized,
-            'created': datetime_str,
-            'updated': updated_str,
-            'messages': message_count[0],
-            'file_path': file_path
-        })
+    # Collapse exact duplicates and link related conversations now that every fingerprint is known
+    if args.collapse_duplicates:
+        start = time.perf_counter()
+        duplicate_ids, rewritten = collapse_duplicate_conversations(records, context)
+        for result in rewritten:
+            manifest_conversations[result['id']] = result['manifest_entry']
+            if result['search_text'] is not None:
+                manifest_entry = result['manifest_entry']
+                update_search_index(search_connection, result['id'], manifest_entry['fingerprint'],
+                                    manifest_entry['file_path'], result['title'], result['search_text'])
+        if search_connection is not None:
+            for conversation_id in duplicate_ids:
+                remove_from_search_index(search_connection, conversation_id)
+        records = [record for record in records if record['id'] not in duplicate_ids]
+        unprocessed_titles = [(conversation_id, title) for conversation_id, title in unprocessed_titles
+                              if conversation_id not in duplicate_ids]
+        print(f"Collapsed {len(duplicate_ids)} exact duplicate conversations.")
+        if stages is not None:
+            record_stage(stages, 'duplicates', start)
+    if args.classify:
+        start = time.perf_counter()
+        classified = classify_unprocessed_conversations(records, context, args.classify_threshold)
+        for record in classified:
+            if search_connection is not None:
+                update_search_index_path(search_connection, record['id'], record['manifest_entry']['file_path'])
+        classified_ids = {record['id'] for record in classified}
+        unprocessed_titles = [(conversation_id, title) for conversation_id, title in unprocessed_titles
+                              if conversation_id not in classified_ids]
+        print(f"Classified {len(classified)} Unprocessed conversations.")
+        if stages is not None:
+            record_stage(stages, 'classify', start)
+    if args.related or args.collapse_duplicates:
+        start = time.perf_counter()
+        linked = link_related_conversations(records, args.related_threshold if args.related else None,
+                                            args.related_limit)
+        print(f"Added related conversation links to {linked} notes.")
+        if stages is not None:
+            record_stage(stages, 'related', start)
+    else:
+        # Without either option, remove the sections left in notes by an earlier run
+        for record in records:
+            if record['manifest_entry'].get('related_section'):
+                set_related_section(record, '')
+
+    for record in records:
+        categorized_conversations[record['category']].append(record['entry'])
+
+    if search_connection is not None:
+        timed(stages, 'search index', search_connection.commit)
+        search_connection.close()
+        print(f"Updated search index: {os.path.join(args.output_dir, SEARCH_INDEX_FILENAME)}")
 
     # Create index file
     print("Creating index.md...")
-    create_index(args.output_dir, categorized_conversations)
+    if args.index_pages:
+        index_shards, written = timed(stages, 'index', create_sharded_index, args.output_dir, categorized_conversations,
+                                      args.index_pages, args.index_page_size, manifest.get('index_shards', {}),
+                                      context['known_folders'])
+        print(f"Updated {written} of {len(index_shards)} index pages.")
+    else:
+        index_shards = {}
+        timed(stages, 'index', create_index, args.output_dir, categorized_conversations)
+        remove_index_shards(args.output_dir, manifest.get('index_shards', {}), keep={'index.md'})
     print(f"Created index.md at: {os.path.join(args.output_dir, 'index.md')}")
 
-    # Write unprocessed titles to file
+    timed(stages, 'manifest', save_manifest, args.output_dir,
+          {'settings': settings, 'render': render_settings, 'classifier': classifier_settings,
+           'index_shards': index_shards, 'conversations': manifest_conversations})
+
+    # Write unprocessed titles to file, removing the previous run's list once nothing is left
+    unprocessed_path = os.path.join(args.output_dir, args.unprocessed_file)
+    if not unprocessed_titles and os.path.isfile(unprocessed_path):
+        os.remove(unprocessed_path)
+        print(f"Removed unprocessed titles file, all conversations are categorized: {unprocessed_path}")
     if unprocessed_titles:
-        unprocessed_path = os.path.join(args.output_dir, args.unprocessed_file)
-        with open(unprocessed_path, 'w', encoding='utf-8') as unprocessed_file:
-            unprocessed_file.write('\n'.join(unprocessed_titles))
+        write_text_file(unprocessed_path, '\n'.join(title for _, title in unprocessed_titles))
         print(f"Unprocessed titles saved in: {unprocessed_path}")
 
     # Generate .txt files with titles and ChatGPT prompt if --split-titles is specified
@@ -369,8 +1810,27 @@ def main():
         generate_title_files(all_titles, args.output_dir, args.split_titles, chatgpt_prompt)
         print("Title .txt files generation complete.")
 
+    if profile:
+        print_profile_summary(profile, time.perf_counter() - run_start)
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile_output)
+        print(f"\nSaved cProfile statistics to: {args.profile_output}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
     print("Processing complete.")
 
+def main():
+    """Main function to process the conversations."""
+    if len(sys.argv) > 1 and sys.argv[1] == 'search':
+        search_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        watch_main(sys.argv[2:])
+        return
+
+    run_export(create_parser().parse_args())
+
 if __name__ == '__main__':
     main()
 
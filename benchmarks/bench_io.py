@@ -0,0 +1,97 @@
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_export import add_export_arguments, export_options, write_export
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ChatGPT_to_Obsidian.py')
+
+# Filesystem calls counted while the exporter runs; os.path.isdir/isfile/getmtime go through os.stat
+COUNTED_FUNCTIONS = [(os, 'stat'), (os, 'lstat'), (os, 'mkdir'), (os, 'open'), (os, 'replace'),
+                     (os, 'remove'), (os, 'rmdir'), (builtins, 'open')]
+
+def read_proc_io():
+    """Return the read/write syscall counters of this process, if the platform exposes them."""
+    try:
+        with open('/proc/self/io', encoding='ascii') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['syscr']), int(fields['syscw'])
+    except OSError:
+        return None
+
+def run_counted(script_path, argv):
+    """Run the exporter's main() in-process and count the filesystem calls it makes."""
+    spec = importlib.util.spec_from_file_location('exporter_under_test', script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    counts = Counter()
+    originals = []
+    for owner, name in COUNTED_FUNCTIONS:
+        original = getattr(owner, name)
+        originals.append((owner, name, original))
+
+        def counted(*args, _name=f"{owner.__name__}.{name}", _original=original, **kwargs):
+            counts[_name] += 1
+            return _original(*args, **kwargs)
+        setattr(owner, name, counted)
+
+    io_before = read_proc_io()
+    old_argv = sys.argv
+    sys.argv = [script_path] + argv
+    try:
+        # Line buffered like a terminal, so every printed line costs a write syscall
+        with open(os.devnull, 'w', buffering=1) as devnull, contextlib.redirect_stdout(devnull):
+            module.main()
+    finally:
+        sys.argv = old_argv
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+    io_after = read_proc_io()
+    if io_before and io_after:
+        counts['read syscalls'] = io_after[0] - io_before[0]
+        counts['write syscalls'] = io_after[1] - io_before[1]
+    return counts
+
+def main():
+    """Count filesystem calls of an export run, optionally against another version of the script."""
+    parser = argparse.ArgumentParser(description='Count I/O calls made by an export run.')
+    add_export_arguments(parser)
+    parser.add_argument('--script', default=SCRIPT_PATH, help='Exporter script to measure')
+    parser.add_argument('--baseline', help='Another version of the exporter script to compare against')
+    parser.add_argument('--args', default='', help='Extra exporter arguments, e.g. "--verbose"')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_io_')
+    try:
+        export_path = os.path.join(work_dir, 'conversations.json')
+        write_export(export_path, **export_options(args))
+        scripts = [('current', args.script)]
+        if args.baseline:
+            scripts.insert(0, ('baseline', args.baseline))
+        results = {}
+        for label, script_path in scripts:
+            output_dir = os.path.join(work_dir, f"out_{label}")
+            results[label] = run_counted(script_path, [export_path, output_dir] + args.args.split())
+
+        names = sorted(set().union(*results.values()))
+        print(f"{args.conversations} conversations, {args.depth} messages each")
+        print(f"{'call':<18}" + ''.join(f"{label:>12}" for label in results))
+        for name in names:
+            print(f"{name:<18}" + ''.join(f"{counts[name]:>12}" for counts in results.values()))
+        for label, counts in results.items():
+            per_conversation = sum(counts.values()) / args.conversations
+            print(f"{label}: {per_conversation:.1f} counted calls per conversation")
+    finally:
+        shutil.rmtree(work_dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ChatGPT_to_Obsidian import KEYWORDS_MAPPING, categorize_by_keywords_in_text, compile_keywords_matcher
+
+FILLER_WORDS = ['the', 'a', 'of', 'and', 'to', 'is', 'in', 'it', 'you', 'we', 'please', 'help', 'how', 'can',
+                'error', 'fix', 'code', 'this', 'with', 'what', 'why', 'when', 'should', 'would', 'thanks']
+
+def reference_categorize(conversation_text, keywords_mapping):
+    """Previous implementation: one re.findall per keyword per category."""
+    category_scores = {}
+    for category, keywords in keywords_mapping.items():
+        score = 0
+        for keyword in keywords:
+            score += len(re.findall(r'\b' + re.escape(keyword) + r'\b', conversation_text, re.IGNORECASE))
+        if score > 0:
+            category_scores[category] = score
+    if category_scores:
+        max_score = max(category_scores.values())
+        return [cat for cat, score in category_scores.items() if score == max_score][0]
+    return None
+
+def generate_corpus(count, words_per_text, keyword_ratio, seed):
+    """Generate synthetic conversation texts mixing filler words and category keywords."""
+    rng = random.Random(seed)
+    keywords = [keyword for keywords in KEYWORDS_MAPPING.values() for keyword in keywords]
+    corpus = []
+    for _ in range(count):
+        words = []
+        for _ in range(rng.randint(words_per_text // 2, words_per_text * 2)):
+            word = rng.choice(keywords) if rng.random() < keyword_ratio else rng.choice(FILLER_WORDS)
+            words.append(word.upper() if rng.random() < 0.1 else word)
+        corpus.append(' '.join(words))
+    return corpus
+
+def main():
+    """Compare the compiled keyword matcher against per-keyword re.findall scans."""
+    parser = argparse.ArgumentParser(description='Benchmark keyword categorization on a synthetic corpus.')
+    parser.add_argument('--conversations', type=int, default=500, help='Number of synthetic conversations')
+    parser.add_argument('--words', type=int, default=1000, help='Average number of words per conversation')
+    parser.add_argument('--keyword-ratio', type=float, default=0.05, help='Fraction of words that are keywords')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the corpus')
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.conversations, args.words, args.keyword_ratio, args.seed)
+    total_mb = sum(len(text) for text in corpus) / 1e6
+    print(f"Corpus: {len(corpus)} conversations, {total_mb:.1f} MB of text")
+
+    start = time.perf_counter()
+    expected = [reference_categorize(text, KEYWORDS_MAPPING) for text in corpus]
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = compile_keywords_matcher(KEYWORDS_MAPPING)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = [categorize_by_keywords_in_text(text, KEYWORDS_MAPPING, matcher) for text in corpus]
+    compiled_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f"Per-keyword re.findall: {reference_time:.3f} s")
+    print(f"Compiled matcher:       {compiled_time:.3f} s (+ {compile_time * 1000:.1f} ms to compile)")
+    print(f"Speedup:                {reference_time / compiled_time:.1f}x")
+    print(f"Mismatched categories:  {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
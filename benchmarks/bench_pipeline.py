@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ChatGPT_to_Obsidian as exporter
+from synthetic_export import add_export_arguments, export_options, write_export
+
+STAGES = ['load', 'traverse', 'categorize', 'render', 'write', 'index']
+
+def peak_rss_mb(who):
+    """Return the peak resident set size in MB of this process or its children, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_stages(export_path, output_dir, active_branch):
+    """Run the export pipeline one stage at a time per conversation and time each stage."""
+    timings = defaultdict(float)
+    context = {'active_branch': active_branch}
+    matcher = exporter.compile_keywords_matcher(exporter.KEYWORDS_MAPPING)
+    os.makedirs(output_dir, exist_ok=True)
+    known_folders = {output_dir}
+    categorized_conversations = defaultdict(list)
+    count = 0
+
+    stream = exporter.iter_conversations(export_path)
+    while True:
+        start = time.perf_counter()
+        item = next(stream, None)
+        timings['load'] += time.perf_counter() - start
+        if item is None:
+            break
+        count += 1
+
+        start = time.perf_counter()
+        messages = exporter.build_conversation_messages(item, context) or []
+        timings['traverse'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        text = exporter.get_conversation_text(messages)
+        category = exporter.categorize_by_keywords_in_text(text, exporter.KEYWORDS_MAPPING, matcher) or 'Unprocessed'
+        timings['categorize'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        markdown = exporter.render_conversation(messages)
+        prompt = exporter.generate_chatgpt_prompt(messages)
+        timings['render'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        title = exporter.sanitize_filename(item.get('title'))
+        folder = os.path.join(output_dir, category, f"{count:08d}")
+        exporter.ensure_folder(os.path.join(output_dir, category), known_folders)
+        exporter.ensure_folder(folder, known_folders)
+        file_path = os.path.join(folder, f"{title}.md")
+        exporter.write_text_file(file_path, markdown)
+        exporter.write_text_file(os.path.join(folder, f"{title}_prompt.txt"), prompt)
+        timings['write'] += time.perf_counter() - start
+
+        categorized_conversations[category].append({
+            'title': title, 'created': '', 'updated': '', 'messages': len(messages), 'file_path': file_path
+        })
+
+    start = time.perf_counter()
+    exporter.create_index(output_dir, categorized_conversations)
+    timings['index'] = time.perf_counter() - start
+    return count, dict(timings)
+
+def run_end_to_end(export_path, output_dir, extra_args):
+    """Run the exporter as a subprocess and return its wall time."""
+    command = [sys.executable, os.path.join(REPO_DIR, 'ChatGPT_to_Obsidian.py'), export_path, output_dir] + extra_args
+    start = time.perf_counter()
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def git_revision():
+    """Return the current git revision of the repository, if available."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_comparison(results, baseline):
+    """Print the relative change of each stage against a previous results file."""
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'}:")
+    for stage in STAGES + ['end_to_end']:
+        old = baseline['stages'].get(stage, {}).get('seconds')
+        new = results['stages'].get(stage, {}).get('seconds')
+        if old and new:
+            print(f"  {stage:<11} {old:8.3f} s -> {new:8.3f} s  ({(new - old) / old * 100:+.1f}%)")
+
+def main():
+    """Benchmark each stage of the exporter on a synthetic export and save the results as JSON."""
+    parser = argparse.ArgumentParser(description='Benchmark the export pipeline stage by stage.')
+    add_export_arguments(parser)
+    parser.add_argument('--export', help='Use an existing conversations.json instead of generating one')
+    parser.add_argument('--active-branch', action='store_true', help='Traverse only the active branch')
+    parser.add_argument('--exporter-args', default='--categorize-by-keywords',
+                        help='Arguments for the end-to-end run of the exporter')
+    parser.add_argument('--skip-end-to-end', action='store_true', help='Only run the staged benchmark')
+    parser.add_argument('--output', default='bench_results.json', help='File to save the results to')
+    parser.add_argument('--compare', help='Previous results file to compare against')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    try:
+        export_path = args.export
+        if not export_path:
+            export_path = os.path.join(work_dir, 'conversations.json')
+            start = time.perf_counter()
+            write_export(export_path, **export_options(args))
+            print(f"Generated export in {time.perf_counter() - start:.1f} s")
+        export_mb = os.path.getsize(export_path) / 1e6
+
+        count, timings = run_stages(export_path, os.path.join(work_dir, 'staged'), args.active_branch)
+        stages = {}
+        for stage in STAGES:
+            seconds = timings.get(stage, 0.0)
+            stages[stage] = {
+                'seconds': seconds,
+                'conversations_per_second': count / seconds if seconds else None,
+                'mb_per_second': export_mb / seconds if seconds else None,
+            }
+        peak_staged = peak_rss_mb(resource.RUSAGE_SELF) if resource else None
+
+        peak_end_to_end = None
+        if not args.skip_end_to_end:
+            extra_args = args.exporter_args.split() + (['--active-branch'] if args.active_branch else [])
+            seconds = run_end_to_end(export_path, os.path.join(work_dir, 'end_to_end'), extra_args)
+            stages['end_to_end'] = {
+                'seconds': seconds,
+                'conversations_per_second': count / seconds,
+                'mb_per_second': export_mb / seconds,
+            }
+            peak_end_to_end = peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+    finally:
+        shutil.rmtree(work_dir)
+
+    results = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': export_options(args) if not args.export else {'export': args.export},
+        'conversations': count,
+        'export_mb': export_mb,
+        'stages': stages,
+        'peak_rss_mb': {'staged': peak_staged, 'end_to_end': peak_end_to_end},
+    }
+
+    print(f"{count} conversations, {export_mb:.1f} MB")
+    print(f"{'stage':<11} {'seconds':>9} {'conv/s':>10} {'MB/s':>9}")
+    for stage, stats in stages.items():
+        rate = stats['conversations_per_second'] or 0
+        throughput = stats['mb_per_second'] or 0
+        print(f"{stage:<11} {stats['seconds']:9.3f} {rate:10.0f} {throughput:9.1f}")
+    for label, peak in results['peak_rss_mb'].items():
+        if peak is not None:
+            print(f"Peak RSS ({label}): {peak:.0f} MB")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ChatGPT_to_Obsidian import KEYWORDS_MAPPING
+
+FILLER_WORDS = ['the', 'a', 'of', 'and', 'to', 'is', 'in', 'it', 'you', 'we', 'please', 'help', 'how', 'can',
+                'error', 'fix', 'code', 'this', 'with', 'what', 'why', 'when', 'should', 'would', 'thanks',
+                'example', 'step', 'first', 'then', 'run', 'file', 'output', 'value', 'use', 'like']
+TITLE_TEMPLATES = ['How to {}', '{} setup', 'Fix {} error', '{} vs {}', 'Question about {}', '{} help']
+TOOL_NAMES = ['browser', 'python', 'dalle.text2im', 'myfiles_browser']
+
+def generate_text(rng, keywords, words, keyword_ratio):
+    """Generate message text mixing filler words, keywords and occasional Markdown."""
+    tokens = [rng.choice(keywords) if rng.random() < keyword_ratio else rng.choice(FILLER_WORDS)
+              for _ in range(words)]
+    if rng.random() < 0.2:
+        tokens.insert(rng.randrange(len(tokens) + 1), '\n```python\nprint("hello")\n```\n')
+    return ' '.join(tokens)
+
+def generate_conversation(rng, index, depth, branching, message_words, keyword_ratio, keywords):
+    """Generate one conversation in the ChatGPT export format.
+
+    depth is the number of messages on the active branch; branching is the probability that a
+    message was edited or regenerated, which adds a sibling branch of a few messages.
+    """
+    node_counter = 0
+
+    def new_node(parent, role, text, tool_name=None):
+        nonlocal node_counter
+        node_id = f"{index:08x}-{node_counter:06x}"
+        node_counter += 1
+        author = {'role': role}
+        if tool_name:
+            author['name'] = tool_name
+        message = None if role is None else {
+            'id': node_id,
+            'author': author,
+            'content': {'content_type': 'text', 'parts': [text]},
+        }
+        mapping[node_id] = {'id': node_id, 'message': message, 'parent': parent, 'children': []}
+        if parent is not None:
+            mapping[parent]['children'].append(node_id)
+        return node_id
+
+    mapping = {}
+    root = new_node(None, None, None)
+    parent = new_node(root, 'system', '')
+    for position in range(depth):
+        role = 'user' if position % 2 == 0 else 'assistant'
+        tool_name = None
+        if role == 'assistant' and rng.random() < 0.1:
+            role, tool_name = 'tool', rng.choice(TOOL_NAMES)
+        words = max(1, int(rng.expovariate(1 / message_words)))
+        if rng.random() < branching:
+            # An abandoned edit or regeneration hanging off the same parent
+            branch_parent = parent
+            for _ in range(rng.randint(1, 3)):
+                branch_parent = new_node(branch_parent, role, generate_text(rng, keywords, words, keyword_ratio))
+        parent = new_node(parent, role, generate_text(rng, keywords, words, keyword_ratio), tool_name)
+
+    create_time = 1672531200 + index * 1800 + rng.random() * 1000
+    title_words = [rng.choice(keywords) for _ in range(2)]
+    template = rng.choice(TITLE_TEMPLATES)
+    title = template.format(*title_words[:template.count('{}')])
+    return {
+        'title': title,
+        'create_time': create_time,
+        'update_time': create_time + rng.random() * 86400,
+        'mapping': mapping,
+        'current_node': parent,
+        'id': f"{index:08x}-0000-4000-8000-000000000000",
+        'conversation_id': f"{index:08x}-0000-4000-8000-000000000000",
+    }
+
+def write_export(path, conversations=1000, depth=20, branching=0.1, message_words=150,
+                 keyword_ratio=0.02, seed=1):
+    """Write a synthetic conversations.json, streaming so huge exports fit in memory."""
+    rng = random.Random(seed)
+    keywords = [keyword for keywords in KEYWORDS_MAPPING.values() for keyword in keywords]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for index in range(conversations):
+            if index:
+                f.write(', ')
+            conversation = generate_conversation(rng, index, depth, branching, message_words, keyword_ratio, keywords)
+            json.dump(conversation, f, ensure_ascii=False)
+        f.write(']')
+    return os.path.getsize(path)
+
+def add_export_arguments(parser):
+    """Add the synthetic export options shared by the benchmark scripts."""
+    parser.add_argument('--conversations', type=int, default=1000, help='Number of conversations')
+    parser.add_argument('--depth', type=int, default=20, help='Messages on the active branch of each conversation')
+    parser.add_argument('--branching', type=float, default=0.1, help='Probability that a message has an edited/regenerated branch')
+    parser.add_argument('--message-words', type=int, default=150, help='Average number of words per message')
+    parser.add_argument('--keyword-ratio', type=float, default=0.02, help='Fraction of words that are category keywords')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed')
+
+def export_options(args):
+    """Return the write_export keyword arguments from parsed command-line options."""
+    return {
+        'conversations': args.conversations,
+        'depth': args.depth,
+        'branching': args.branching,
+        'message_words': args.message_words,
+        'keyword_ratio': args.keyword_ratio,
+        'seed': args.seed,
+    }
+
+def main():
+    """Generate a synthetic ChatGPT export."""
+    parser = argparse.ArgumentParser(description='Generate a synthetic ChatGPT conversations.json export.')
+    parser.add_argument('output_file', help='Path of the conversations.json to write')
+    add_export_arguments(parser)
+    args = parser.parse_args()
+    size = write_export(args.output_file, **export_options(args))
+    print(f"Wrote {args.conversations} conversations ({size / 1e6:.1f} MB) to {args.output_file}")
+
+if __name__ == '__main__':
+    main()